@@ -34,9 +34,13 @@ import io
 import hashlib
 import datetime
 import tempfile
+import unicodedata
 import zipfile
 import streamlit as st
+from array import array
+from functools import lru_cache, wraps
 from pathlib import Path
+from types import MappingProxyType
 from typing import List, Dict, Optional, Tuple
 
 try:
@@ -69,7 +73,8 @@ except ImportError:
 APP_TITLE = "Markdown Converter"
 # Resolve paths relative to the script file (Fix: fragile relative paths)
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
-VENDOR_DIR = os.path.join(APP_DIR, "vendor")
+# Resolved once so vendor path checks need not realpath() the base every call
+VENDOR_DIR = os.path.realpath(os.path.join(APP_DIR, "vendor"))
 MARKED_FILE = "marked.umd.min.js"
 PURIFY_FILE = "purify.min.js"
 HIGHLIGHT_FILE = "highlight.min.js"
@@ -82,6 +87,8 @@ MAX_VENDOR_JS_SIZE = 10 * 1024 * 1024  # 10 MB
 
 # Filename and sheet name limits
 MAX_FILENAME_BYTES = 255  # Most filesystems limit to 255 bytes
+MAX_PATH_LENGTH = 4096  # Linux PATH_MAX; longer project paths are rejected unresolved
+MAX_FILENAME_INPUT = 8192  # Only this many leading characters of a name are considered
 MAX_EXCEL_SHEET_NAME = 31  # Excel sheet names limited to 31 characters
 
 # Supported document fonts (shared between DOCX and PDF export)
@@ -109,21 +116,23 @@ def read_text_file(path: str, max_size: int = MAX_VENDOR_JS_SIZE) -> str:
         st.error(f"Failed to read {path}: {e}")
         st.stop()
 
+# Must start with alphanumeric (not dot) so hidden files can't be reached
+_VENDOR_FILENAME_RE = re.compile(r'[a-zA-Z0-9][a-zA-Z0-9._-]*')
+
 def validate_vendor_path(base_dir: str, filename: str) -> str:
     """Validate and resolve vendor file path to prevent traversal.
 
     Uses realpath() to resolve symlinks, preventing symlink-based attacks
     where a symlink in the vendor directory points to files outside it.
     """
-    # Require filename to start with alphanumeric (not dot) to prevent access to hidden files
-    if not re.match(r'^[a-zA-Z0-9][a-zA-Z0-9._-]*$', filename):
+    if not _VENDOR_FILENAME_RE.fullmatch(filename):
         st.error(f"Invalid filename: {filename}")
         st.stop()
     path = os.path.join(base_dir, filename)
     # Use realpath to resolve both symlinks and relative paths
     # This prevents attacks using symlinks that point outside the vendor directory
     resolved = os.path.realpath(path)
-    base_resolved = os.path.realpath(base_dir)
+    base_resolved = base_dir if base_dir == VENDOR_DIR else os.path.realpath(base_dir)
     # Use os.sep to ensure we're checking full directory components
     # This prevents /home/user from matching /home/username
     if not (resolved.startswith(base_resolved + os.sep) or resolved == base_resolved):
@@ -178,15 +187,61 @@ def load_vendor_js(use_highlight: bool = False, use_katex: bool = False) -> dict
 
     return result
 
+# Characters that require HTML escaping; a regex search scans in C and lets
+# clean input (the common case) be returned without allocating a new string
+_HTML_SPECIAL_RE = re.compile(r'[&<>"\']')
+
+# '<' that starts </script (any case) or an HTML comment inside a script block;
+# both are neutralized by inserting a backslash after the '<'
+_SCRIPT_BREAKOUT_RE = re.compile(r'<(?=/script|!--)', re.IGNORECASE)
+
+# Unicode line separators that terminate JS string literals
+_JS_LINE_SEPARATOR_TABLE = MappingProxyType(str.maketrans({
+    '\u2028': '\\u2028',
+    '\u2029': '\\u2029',
+}))
+
+# Single-pass HTML escape table (str.translate walks the input once)
+_HTML_ESCAPE_TABLE = MappingProxyType(str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+}))
+
+def _length_bounded_cache(max_len: int, maxsize: int = 1024):
+    """
+    Memoize a pure function keyed on a leading string argument.
+
+    Calls whose first argument is longer than max_len skip the cache, so
+    oversized (often user-controlled) strings are never pinned in memory.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(s, *args):
+            if s and len(s) > max_len:
+                return func(s, *args)
+            return cached(s, *args)
+
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+# Titles, labels and attribute values are memoized; document bodies are not
+_ESCAPE_CACHE_MAX_LEN = 256
+
+@_length_bounded_cache(_ESCAPE_CACHE_MAX_LEN)
 def escape_html(s: str) -> str:
     """Escape HTML special characters including quotes."""
     if not s:
         return ""
-    return (s.replace("&", "&amp;")
-             .replace("<", "&lt;")
-             .replace(">", "&gt;")
-             .replace('"', "&quot;")
-             .replace("'", "&#x27;"))
+    if not _HTML_SPECIAL_RE.search(s):
+        return s
+    return s.translate(_HTML_ESCAPE_TABLE)
 
 def escape_for_script_tag(s: str) -> str:
     """Escape string for safe inclusion in a <script> data block.
@@ -196,34 +251,58 @@ def escape_for_script_tag(s: str) -> str:
     """
     if not s:
         return ""
+    # Each pass runs only if its trigger sequence is present, so clean
+    # input (the common case) is returned without allocating
+
     # Escape </script case-insensitively to prevent HTML parser from closing the tag
     # We replace </script with <\/script which breaks the tag pattern
     # Also handle whitespace variants like </script > and </script\t>
-    s = re.sub(r'</(script)', r'<\\/\1', s, flags=re.IGNORECASE)
-    # Also escape HTML comment sequences which could break script context
-    s = s.replace('<!--', '<\\!--')
+    # HTML comment openers become <\!-- in the same pass
+    if '</' in s or '<!' in s:
+        s = _SCRIPT_BREAKOUT_RE.sub(r'<\\', s)
     # Escape Unicode line separators (U+2028, U+2029) which can break JS strings
-    s = s.replace('\u2028', '\\u2028')
-    s = s.replace('\u2029', '\\u2029')
+    if '\u2028' in s or '\u2029' in s:
+        s = s.translate(_JS_LINE_SEPARATOR_TABLE)
     return s
 
+# YYYY-MM-DD shape check; rejects most bad input without raising ValueError
+_ISO_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+@lru_cache(maxsize=256)
 def validate_date(date_str: str) -> bool:
     """Validate ISO date format."""
     if not date_str:
         return True
+    if not _ISO_DATE_RE.fullmatch(date_str):
+        return False
     try:
         datetime.date.fromisoformat(date_str)
         return True
     except ValueError:
         return False
 
+# Allow percentage, px, em, rem, vh, vw with optional decimal (ASCII digits only)
+_CSS_SIZE_RE = re.compile(r'[0-9]+(?:\.[0-9]+)?(?:px|%|r?em|v[hw])')
+_ASCII_DIGITS = frozenset('0123456789')
+_CSS_SIZE_UNITS = ('px', '%', 'em', 'vh', 'vw')  # 'rem' ends in 'em'
+MAX_CSS_SIZE_LENGTH = 32  # Far beyond any real size value
+
+@lru_cache(maxsize=256)
+def _css_size_matches(value: str) -> bool:
+    # Only reached with values of at most MAX_CSS_SIZE_LENGTH characters, so
+    # cache keys stay small; documents repeat the same few sizes
+    return _CSS_SIZE_RE.fullmatch(value) is not None
+
 def validate_css_size(value: str) -> bool:
     """Validate CSS size value to prevent injection."""
-    if not value:
+    # Every valid size starts with an ASCII digit and ends in a unit; reject
+    # anything else (empty, keywords, url(...), expression(...), oversized
+    # input) without touching the regex
+    if (not value or len(value) > MAX_CSS_SIZE_LENGTH
+            or value[0] not in _ASCII_DIGITS
+            or not value.endswith(_CSS_SIZE_UNITS)):
         return False
-    # Allow percentage, px, em, rem, vh, vw with optional decimal
-    pattern = r'^\d+(\.\d+)?(px|%|em|rem|vh|vw)$'
-    return bool(re.match(pattern, value))
+    return _css_size_matches(value)
 
 def sanitize_css_size(value: str, default: str) -> str:
     """Sanitize CSS size value, return default if invalid."""
@@ -232,16 +311,55 @@ def sanitize_css_size(value: str, default: str) -> str:
     st.warning(f"Invalid CSS size value: {value}. Using default: {default}")
     return default
 
+# Filename sanitization patterns (compiled once, shared by both sanitizers)
+# Runs of characters not in: word chars, whitespace, dot, underscore, or hyphen
+_FILENAME_UNSAFE_RE = re.compile(r'[^\w\s._-]+')
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+# The same ASCII deletions as a translate table, derived from the regex so the
+# two can't drift apart
+_FILENAME_ASCII_DROP_TABLE = MappingProxyType(
+    {c: None for c in range(128) if _FILENAME_UNSAFE_RE.match(chr(c))}
+)
+
+def _clean_filename(name: str) -> str:
+    """Reduce a name to filename-safe characters, shared by both sanitizers."""
+    # Bound the work on oversized input: characters past MAX_FILENAME_INPUT are
+    # ignored, even if everything before them is stripped as unsafe
+    name = name[:MAX_FILENAME_INPUT]
+    # Remove characters not in: word chars, whitespace, dot, underscore, or hyphen
+    # (ASCII names, the common case, use a single C-level translate pass)
+    if name.isascii():
+        name = name.translate(_FILENAME_ASCII_DROP_TABLE)
+    else:
+        # Compose first so NFC and NFD spellings of a name sanitize identically
+        name = unicodedata.normalize('NFC', name)
+        name = _FILENAME_UNSAFE_RE.sub('', name)
+    # Replace multiple whitespace with single underscore
+    name = _WHITESPACE_RUN_RE.sub('_', name)
+    # Remove leading/trailing dots, underscores, or hyphens
+    return name.strip('._-')
+
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    """Truncate text to at most max_bytes of UTF-8 without splitting a character."""
+    # A code point is at most 4 UTF-8 bytes, so short names fit without encoding
+    if len(text) * 4 <= max_bytes:
+        return text
+    # ASCII is one byte per character, so a plain slice needs no encoding
+    if text.isascii():
+        return text[:max_bytes]
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    # The bytes came from a valid str, so the only undecodable part is a code
+    # point split at the cut; errors='ignore' drops exactly that tail
+    return encoded[:max_bytes].decode('utf-8', errors='ignore')
+
+@_length_bounded_cache(MAX_FILENAME_BYTES)
 def sanitize_filename(name: str) -> str:
     """Sanitize filename for download."""
     if not name:
         return "document.html"
-    # Remove characters not in: word chars, whitespace, dot, underscore, or hyphen
-    name = re.sub(r'[^\w\s._-]', '', name)
-    # Replace multiple whitespace with single underscore
-    name = re.sub(r'[\s]+', '_', name)
-    # Remove leading/trailing dots, underscores, or hyphens
-    name = name.strip('._-')
+    name = _clean_filename(name)
     if not name:
         return "document.html"
     # Extract base name and truncate to leave room for .html extension
@@ -250,12 +368,14 @@ def sanitize_filename(name: str) -> str:
     # Truncate by BYTE count, not character count (for Unicode safety)
     # Most filesystems have 255 byte limit, so use (MAX_FILENAME_BYTES - 5) bytes for base + 5 for .html
     max_base_bytes = MAX_FILENAME_BYTES - 5  # Leave room for .html extension
-    # Optimization: slice to max chars first (since 1 char >= 1 byte)
-    if len(base) > max_base_bytes:
-        base = base[:max_base_bytes]
-    while len(base.encode('utf-8')) > max_base_bytes:
-        base = base[:-1]
-    return base + '.html'
+    return _truncate_utf8(base, max_base_bytes) + '.html'
+
+# Sequences that can terminate an HTML comment, and their encoded forms
+_COMMENT_UNSAFE_RE = re.compile(r'--|>')
+_COMMENT_ESCAPES = MappingProxyType({"--": "&#45;&#45;", ">": "&gt;"})
+
+def _comment_escape(match: re.Match) -> str:
+    return _COMMENT_ESCAPES[match.group()]
 
 def sanitize_for_html_comment(text: str) -> str:
     """Sanitize text for safe inclusion in HTML comments.
@@ -264,9 +384,12 @@ def sanitize_for_html_comment(text: str) -> str:
     """
     if not text:
         return ""
+    # Nothing to escape (the usual case): skip the regex
+    if '--' not in text and '>' not in text:
+        return text
     # Replace -- with encoded version to prevent comment breakout
-    # Also handle > after -- which closes comments
-    return text.replace("--", "&#45;&#45;").replace(">", "&gt;")
+    # Also handle > after -- which closes comments (both in a single pass)
+    return _COMMENT_UNSAFE_RE.sub(_comment_escape, text)
 
 def safe_read_file(base_dir: str, relative_path: str) -> str:
     """
@@ -274,6 +397,14 @@ def safe_read_file(base_dir: str, relative_path: str) -> str:
     Prevents path traversal attacks (e.g., ../../../../etc/passwd).
     Also prevents symlink attacks by resolving symbolic links.
     """
+    # A null byte can never name a real file; reject before any path work
+    if '\x00' in relative_path:
+        raise ValueError(f"Security violation: Path {relative_path!r} contains a null byte.")
+    # os.path.join drops the base entirely for an absolute second argument;
+    # refuse rooted and drive-letter paths (on any platform) before joining
+    if (os.path.isabs(relative_path) or relative_path.startswith(('/', '\\'))
+            or (relative_path[:1].isalpha() and relative_path[1:2] == ':')):
+        raise ValueError(f"Security violation: Path '{relative_path}' is absolute.")
     # Use realpath to resolve both symlinks and relative paths
     # This prevents attacks using symlinks that point outside the base directory
     base_real = os.path.realpath(os.path.normpath(base_dir))
@@ -286,9 +417,17 @@ def safe_read_file(base_dir: str, relative_path: str) -> str:
     if not (target_real.startswith(base_real + os.sep) or target_real == base_real):
         raise ValueError(f"Security violation: Path '{relative_path}' resolves outside base directory.")
 
-    with open(target_real, "r", encoding="utf-8") as f:
+    # utf-8-sig drops a leading BOM that would otherwise hide a first-line heading
+    with open(target_real, "r", encoding="utf-8-sig") as f:
         return f.read()
 
+# Known document extensions replaced by sanitize_filename_for_format
+_STRIPPABLE_EXTENSIONS = frozenset({
+    '.html', '.htm', '.md', '.markdown', '.docx', '.doc', '.xlsx', '.xls',
+})
+
+
+@_length_bounded_cache(MAX_FILENAME_BYTES)
 def sanitize_filename_for_format(name: str, extension: str) -> str:
     """
     Sanitize filename for a specific format extension.
@@ -304,26 +443,19 @@ def sanitize_filename_for_format(name: str, extension: str) -> str:
         return f"document{extension}"
 
     # Remove characters not safe for filenames
-    name = re.sub(r'[^\w\s._-]', '', name)
-    name = re.sub(r'[\s]+', '_', name)
-    name = name.strip('._-')
+    name = _clean_filename(name)
 
     if not name:
         return f"document{extension}"
 
     # Remove existing extension if present (case-insensitive)
-    for ext in ['.html', '.htm', '.md', '.markdown', '.docx', '.doc', '.xlsx', '.xls']:
-        if name.lower().endswith(ext):
-            name = name[:-len(ext)]
-            break
+    base, ext = os.path.splitext(name)
+    if ext.lower() in _STRIPPABLE_EXTENSIONS:
+        name = base
 
     # Truncate by byte count for Unicode safety (MAX_FILENAME_BYTES - extension length)
     max_base_bytes = MAX_FILENAME_BYTES - len(extension.encode('utf-8'))
-    # Optimization: slice to max chars first
-    if len(name) > max_base_bytes:
-        name = name[:max_base_bytes]
-    while len(name.encode('utf-8')) > max_base_bytes:
-        name = name[:-1]
+    name = _truncate_utf8(name, max_base_bytes)
 
     return name + extension
 
@@ -331,6 +463,10 @@ def sanitize_filename_for_format(name: str, extension: str) -> str:
 
 class Chapter:
     """Represents a chapter in an mdBook."""
+    # Books can hold thousands of chapters; slots drop the per-instance __dict__
+    __slots__ = ('title', 'path', 'level', 'is_draft', 'is_separator',
+                 'is_part_title', 'number', 'content', 'children')
+
     def __init__(self, title: str, path: Optional[str] = None, level: int = 0,
                  is_draft: bool = False, is_separator: bool = False,
                  is_part_title: bool = False, number: Optional[str] = None):
@@ -361,46 +497,115 @@ def parse_book_toml(toml_path: str) -> Dict:
         st.error(f"Failed to parse book.toml: {e}")
         return {"book": {"title": "Book", "authors": [], "language": "en"}}
 
+# SUMMARY.md line patterns
+_SUMMARY_SEPARATOR_RE = re.compile(r'-{3,}')
+MAX_SUMMARY_NESTING = 100  # Practical limit for nesting depth (must fit in a byte)
+_SUMMARY_LINK_RE = re.compile(r'^(\s*)([-*])\s+\[([^\]]+)\]\((.+)\)\s*$')
+_SUMMARY_EMPTY_LINK_RE = re.compile(r'^(\s*)([-*])\s+\[([^\]]+)\]\(\)\s*$')
+
+# Zero-width characters, BOM and bidi embedding/override/isolate controls;
+# invisible in rendered titles but able to hide or reorder what the reader sees
+_INVISIBLE_CODEPOINTS = (
+    0x200B, 0x200C, 0x200D, 0x2060, 0xFEFF,
+    0x202A, 0x202B, 0x202C, 0x202D, 0x202E,
+    0x2066, 0x2067, 0x2068, 0x2069,
+)
+_INVISIBLE_DROP_TABLE = MappingProxyType(dict.fromkeys(_INVISIBLE_CODEPOINTS))
+
+def _scrub_invisible(text: str) -> str:
+    """Remove invisible formatting characters from user-visible text."""
+    if text.isascii():
+        return text
+    return text.translate(_INVISIBLE_DROP_TABLE)
+
+def _number_chapters(levels: array, drafts: bytearray) -> List[Optional[str]]:
+    """
+    Compute chapter numbers ("1", "1.2", ...) from per-chapter nesting levels.
+
+    Numbering starts at the first root-level non-draft chapter; drafts and
+    anything before that point are unnumbered.
+    """
+    numbers: List[Optional[str]] = []
+    # Per-level chapter counters; entries deeper than the current level are
+    # dropped (equivalent to resetting them to zero)
+    counts: List[int] = []
+    in_numbered_section = False
+
+    for level, is_draft in zip(levels, drafts):
+        if is_draft:
+            numbers.append(None)
+            continue
+
+        # First root-level chapter with content starts numbered section
+        if not in_numbered_section:
+            if level != 0:
+                numbers.append(None)
+                continue
+            in_numbered_section = True
+
+        # Initialize level counters if needed
+        if len(counts) <= level:
+            counts.extend([0] * (level + 1 - len(counts)))
+        counts[level] += 1
+        # Reset deeper levels
+        del counts[level + 1:]
+        # Build number string (e.g., "1.2.3"), skipping levels never entered
+        number_parts = [str(count) for count in counts if count > 0]
+        numbers.append('.'.join(number_parts) if number_parts else None)
+
+    return numbers
+
 def parse_summary_md(summary_path: str) -> List[Chapter]:
     """Parse SUMMARY.md file and extract chapter structure."""
     try:
-        with open(summary_path, 'r', encoding='utf-8') as f:
+        with open(summary_path, 'r', encoding='utf-8-sig') as f:
             content = f.read()
     except Exception as e:
         st.error(f"Failed to read SUMMARY.md: {e}")
         return []
 
+    return _parse_summary_md_text(content)
+
+def _parse_summary_md_text(content: str) -> List[Chapter]:
+    """Extract chapter structure from SUMMARY.md text."""
     chapters = []
     lines = content.split('\n')
-    # Use a dict for dynamic nesting levels instead of fixed array
-    numbered_chapter_count: Dict[int, int] = {}
-    in_numbered_section = False
-    max_level = 100  # Practical limit for nesting depth
+    # Link entries plus their levels/draft flags in parallel compact arrays;
+    # numbering runs over the arrays after parsing
+    link_chapters: List[Chapter] = []
+    levels = array('B')
+    drafts = bytearray()
 
     for line in lines:
+        stripped = line.strip()
         # Skip empty lines
-        if not line.strip():
+        if not stripped:
             continue
 
         # Check for separator (---)
-        if re.match(r'^-{3,}$', line.strip()):
+        if _SUMMARY_SEPARATOR_RE.fullmatch(stripped):
             chapters.append(Chapter("", is_separator=True))
             continue
 
         # Check for part title (# Title)
-        if line.strip().startswith('#'):
-            title = line.strip().lstrip('#').strip()
+        if stripped.startswith('#'):
+            title = _scrub_invisible(stripped.lstrip('#')).strip()
             if title and title.lower() != 'summary':  # Ignore empty or "Summary" title
                 chapters.append(Chapter(title, is_part_title=True))
             continue
 
+        # Every link entry starts with a list marker; prose, HTML and other
+        # lines can be dropped without running the link patterns
+        if stripped[0] not in '-*':
+            continue
+
         # Check for chapter link: [Title](path) or [Title]()
         # Use a more robust regex that handles special characters in paths
         # Match: indent, bullet, [title](path) where path can contain parentheses
-        link_match = re.match(r'^(\s*)([-*])\s+\[([^\]]+)\]\((.+)\)\s*$', line)
+        link_match = _SUMMARY_LINK_RE.match(line)
         if not link_match:
             # Try matching empty path: [Title]()
-            link_match = re.match(r'^(\s*)([-*])\s+\[([^\]]+)\]\(\)\s*$', line)
+            link_match = _SUMMARY_EMPTY_LINK_RE.match(line)
             if link_match:
                 indent, marker, title = link_match.groups()
                 path = ""
@@ -430,41 +635,28 @@ def parse_summary_md(summary_path: str) -> List[Chapter]:
                         path = remaining[:path_end]
 
         # Calculate indentation level handling both spaces and tabs
+        # Any indent this long already reaches the cap, so don't expand the rest
+        indent = indent[:MAX_SUMMARY_NESTING * 2]
         # Expand tabs to 4 spaces (common convention) then divide by 2
         expanded_indent = indent.replace('\t', '    ')  # Tab = 4 spaces
         level = len(expanded_indent) // 2  # 2 spaces per level
         # Cap the level to prevent excessive nesting
-        level = min(level, max_level)
+        level = min(level, MAX_SUMMARY_NESTING)
         is_draft = not path.strip()
 
-        # Determine if this is a numbered chapter
-        if not in_numbered_section and level == 0 and not is_draft:
-            # First root-level chapter with content starts numbered section
-            in_numbered_section = True
-
-        # Generate chapter number if in numbered section
-        chapter_number = None
-        if in_numbered_section and not is_draft:
-            # Initialize level counter if needed
-            if level not in numbered_chapter_count:
-                numbered_chapter_count[level] = 0
-            numbered_chapter_count[level] += 1
-            # Reset deeper levels
-            for deeper_level in list(numbered_chapter_count.keys()):
-                if deeper_level > level:
-                    numbered_chapter_count[deeper_level] = 0
-            # Build number string (e.g., "1.2.3")
-            number_parts = [str(numbered_chapter_count.get(i, 0)) for i in range(level + 1) if numbered_chapter_count.get(i, 0) > 0]
-            chapter_number = '.'.join(number_parts) if number_parts else None
-
         chapter = Chapter(
-            title=title.strip(),
+            title=_scrub_invisible(title).strip(),
             path=path.strip() if path.strip() else None,
             level=level,
-            is_draft=is_draft,
-            number=chapter_number
+            is_draft=is_draft
         )
         chapters.append(chapter)
+        link_chapters.append(chapter)
+        levels.append(level)
+        drafts.append(is_draft)
+
+    for chapter, number in zip(link_chapters, _number_chapters(levels, drafts)):
+        chapter.number = number
 
     return chapters
 
@@ -492,6 +684,9 @@ def read_markdown_file(base_path: str, file_path: str) -> str:
         st.warning(f"Failed to read {filename}: {error_type}")
         return f"<!-- Error reading {safe_filename}: {sanitize_for_html_comment(error_type)} -->\n"
 
+# Markdown heading markers indexed by depth (H1-H6)
+_HEADING_PREFIXES = ('', '#', '##', '###', '####', '#####', '######')
+
 def combine_chapters(chapters: List[Chapter], base_path: str) -> Tuple[str, List[Dict]]:
     """
     Combine all chapters into a single markdown document.
@@ -518,8 +713,7 @@ def combine_chapters(chapters: List[Chapter], base_path: str) -> Tuple[str, List
             # Add chapter heading
             # Cap at H6 (maximum valid HTML heading level)
             # H2 for level 0, H3 for level 1, ..., H6 for level 4+
-            heading_depth = min(chapter.level + 2, 6)
-            heading_level = "#" * heading_depth
+            heading_level = _HEADING_PREFIXES[min(chapter.level + 2, 6)]
             chapter_title = chapter.title
             if chapter.number:
                 chapter_title = f"{chapter.number}. {chapter.title}"
@@ -561,6 +755,35 @@ def combine_chapters(chapters: List[Chapter], base_path: str) -> Tuple[str, List
 
     return combined_md, chapter_metadata
 
+# Sensitive system directories that project paths may not resolve into
+# This list covers common Unix/Linux sensitive locations
+_SENSITIVE_DIRS = (
+    '/etc',           # System configuration
+    '/var',           # Variable data (logs, etc.)
+    '/root',          # Root user home
+    '/home/root',     # Alternative root home
+    '/sys',           # Kernel/system info
+    '/proc',          # Process information
+    '/dev',           # Device files
+    '/boot',          # Boot files
+    '/usr/sbin',      # System binaries
+    '/sbin',          # Essential system binaries
+    '/tmp',           # Temp files (potential symlink attacks)
+    '/run',           # Runtime data
+    '/lib',           # System libraries
+    '/lib64',         # 64-bit system libraries
+)
+# Pair each directory with its resolved location, resolved once at import:
+# project paths are compared after realpath(), so a symlinked system dir
+# (e.g. /etc -> /private/etc on macOS, /lib -> /usr/lib) must match too
+_SENSITIVE_DIR_TARGETS = tuple(
+    (display, target)
+    for display in _SENSITIVE_DIRS
+    for target in dict.fromkeys((display, os.path.realpath(display)))
+)
+_SENSITIVE_DIR_EXACT = frozenset(target for _, target in _SENSITIVE_DIR_TARGETS)
+_SENSITIVE_DIR_PREFIXES = tuple(target + os.sep for _, target in _SENSITIVE_DIR_TARGETS)
+
 def validate_project_path(project_path: str) -> Tuple[bool, str]:
     """
     Validate an mdBook project path for security.
@@ -569,6 +792,12 @@ def validate_project_path(project_path: str) -> Tuple[bool, str]:
     if not project_path:
         return False, "Project path is empty."
 
+    if len(project_path) > MAX_PATH_LENGTH:
+        return False, "Path is too long."
+
+    if '\x00' in project_path:
+        return False, "Path contains a null byte."
+
     # Normalize the path
     normalized = os.path.normpath(project_path)
 
@@ -584,31 +813,17 @@ def validate_project_path(project_path: str) -> Tuple[bool, str]:
         return False, "Invalid path."
 
     # Check if the resolved path points to sensitive system directories
-    # This list covers common Unix/Linux sensitive locations
-    sensitive_dirs = [
-        '/etc',           # System configuration
-        '/var',           # Variable data (logs, etc.)
-        '/root',          # Root user home
-        '/home/root',     # Alternative root home
-        '/sys',           # Kernel/system info
-        '/proc',          # Process information
-        '/dev',           # Device files
-        '/boot',          # Boot files
-        '/usr/sbin',      # System binaries
-        '/sbin',          # Essential system binaries
-        '/tmp',           # Temp files (potential symlink attacks)
-        '/run',           # Runtime data
-        '/lib',           # System libraries
-        '/lib64',         # 64-bit system libraries
-    ]
+    # (one C-level startswith over all prefixes; only name the match on failure)
+    if real_path in _SENSITIVE_DIR_EXACT or real_path.startswith(_SENSITIVE_DIR_PREFIXES):
+        sensitive = next(
+            display for display, target in _SENSITIVE_DIR_TARGETS
+            if real_path == target or real_path.startswith(target + os.sep)
+        )
+        return False, f"Access to system directory '{sensitive}' is not allowed."
 
     # Also check for sensitive files in user home directories
     home_sensitive_patterns = ['.ssh', '.gnupg', '.aws', '.config/gcloud', '.kube']
 
-    for sensitive in sensitive_dirs:
-        if real_path == sensitive or real_path.startswith(sensitive + os.sep):
-            return False, f"Access to system directory '{sensitive}' is not allowed."
-
     # Check for sensitive patterns in home directories
     for pattern in home_sensitive_patterns:
         if f'/{pattern}/' in real_path or real_path.endswith(f'/{pattern}'):
@@ -653,6 +868,13 @@ def process_mdbook_project(project_path: str) -> Tuple[str, Dict, List[Dict]]:
 
 # ---------- DOCX Conversion ----------
 
+def _is_bullet_line(line: str) -> bool:
+    """Check if line is a bullet (starts with '- ' after optional whitespace)."""
+    # str.lstrip()/isspace() use the same Unicode whitespace set as regex \s
+    stripped = line.lstrip()
+    return len(stripped) > 1 and stripped[0] == '-' and stripped[1].isspace()
+
+
 def _preprocess_markdown_for_docx(content: str) -> str:
     """
     Preprocess markdown to fix bullet list formatting issues.
@@ -664,19 +886,15 @@ def _preprocess_markdown_for_docx(content: str) -> str:
     lines = content.split('\n')
     result = []
 
-    def is_bullet_line(line):
-        """Check if line is a bullet (starts with '- ' after optional whitespace)."""
-        return bool(re.match(r'^(\s*)-\s', line))
-
     i = 0
     while i < len(lines):
         line = lines[i]
 
-        if is_bullet_line(line):
+        if _is_bullet_line(line):
             # Insert blank line before list if needed
             if result:
                 prev_line = result[-1]
-                if prev_line.strip() != '' and not is_bullet_line(prev_line):
+                if prev_line.strip() != '' and not _is_bullet_line(prev_line):
                     result.append('')
 
             result.append(line)
@@ -686,7 +904,7 @@ def _preprocess_markdown_for_docx(content: str) -> str:
             while j < len(lines) and lines[j].strip() == '':
                 j += 1
 
-            if j < len(lines) and is_bullet_line(lines[j]):
+            if j < len(lines) and _is_bullet_line(lines[j]):
                 i = j - 1
         else:
             result.append(line)
@@ -696,6 +914,29 @@ def _preprocess_markdown_for_docx(content: str) -> str:
     return '\n'.join(result)
 
 
+# XML rewrites applied by _postprocess_docx, compiled once at import
+_DOCX_COLOR_RE = re.compile(r'<w:color\s+w:val="[0-9A-Fa-f]{6}"\s*/>')
+_DOCX_THEME_COLOR_RE = re.compile(r'<w:color[^>]*w:themeColor="[^"]*"[^>]*/>')
+# (pattern, attribute written back); theme references collapse onto the
+# plain attribute so the user's font wins. Order matches the original passes.
+_DOCX_FONT_ATTR_RES = tuple(
+    (re.compile(pattern), attr)
+    for pattern, attr in (
+        (r'w:ascii="[^"]*"', 'w:ascii'),
+        (r'w:hAnsi="[^"]*"', 'w:hAnsi'),
+        (r'w:eastAsia="[^"]*"', 'w:eastAsia'),
+        (r'w:cs="[^"]*"', 'w:cs'),
+        (r'w:asciiTheme="[^"]*"', 'w:ascii'),
+        (r'w:hAnsiTheme="[^"]*"', 'w:hAnsi'),
+        (r'w:eastAsiaTheme="[^"]*"', 'w:eastAsia'),
+        (r'w:cstheme="[^"]*"', 'w:cs'),
+    )
+)
+_DOCX_PGSZ_RE = re.compile(r'<w:pgSz[^/]*/>')
+_DOCX_PGMAR_RE = re.compile(r'<w:pgMar[^/]*/>')
+_DOCX_TYPEFACE_RE = re.compile(r'typeface="[^"]*"')
+
+
 def _postprocess_docx(docx_bytes: bytes, font_name: str = "Times New Roman", font_size: str = "12") -> bytes:
     """
     Post-process DOCX to fix pandoc's default styling.
@@ -721,8 +962,9 @@ def _postprocess_docx(docx_bytes: bytes, font_name: str = "Times New Roman", fon
     # Convert font size to half-points (Word uses half-points internally)
     font_size_half_pts = str(font_size_int * 2)
 
+    output_buffer = io.BytesIO()
+
     with zipfile.ZipFile(io.BytesIO(docx_bytes), 'r') as zin:
-        output_buffer = io.BytesIO()
         with zipfile.ZipFile(output_buffer, 'w', zipfile.ZIP_DEFLATED) as zout:
             for item in zin.infolist():
                 data = zin.read(item.filename)
@@ -730,26 +972,19 @@ def _postprocess_docx(docx_bytes: bytes, font_name: str = "Times New Roman", fon
                 if item.filename == 'word/styles.xml':
                     content = data.decode('utf-8')
                     # Remove explicit color values (e.g., blue headers)
-                    content = re.sub(r'<w:color\s+w:val="[0-9A-Fa-f]{6}"\s*/>', '', content)
+                    content = _DOCX_COLOR_RE.sub('', content)
                     # Remove theme color references
-                    content = re.sub(r'<w:color[^>]*w:themeColor="[^"]*"[^>]*/>', '', content)
-                    # Replace fonts with user-specified font
-                    content = re.sub(r'w:ascii="[^"]*"', f'w:ascii="{font_name}"', content)
-                    content = re.sub(r'w:hAnsi="[^"]*"', f'w:hAnsi="{font_name}"', content)
-                    content = re.sub(r'w:eastAsia="[^"]*"', f'w:eastAsia="{font_name}"', content)
-                    content = re.sub(r'w:cs="[^"]*"', f'w:cs="{font_name}"', content)
-                    # Replace theme font references
-                    content = re.sub(r'w:asciiTheme="[^"]*"', f'w:ascii="{font_name}"', content)
-                    content = re.sub(r'w:hAnsiTheme="[^"]*"', f'w:hAnsi="{font_name}"', content)
-                    content = re.sub(r'w:eastAsiaTheme="[^"]*"', f'w:eastAsia="{font_name}"', content)
-                    content = re.sub(r'w:cstheme="[^"]*"', f'w:cs="{font_name}"', content)
+                    content = _DOCX_THEME_COLOR_RE.sub('', content)
+                    # Replace fonts and theme font references with user-specified font
+                    for pattern, attr in _DOCX_FONT_ATTR_RES:
+                        content = pattern.sub(f'{attr}="{font_name}"', content)
                     data = content.encode('utf-8')
 
                 elif item.filename == 'word/document.xml':
                     content = data.decode('utf-8')
                     # Remove inline color styling
-                    content = re.sub(r'<w:color\s+w:val="[0-9A-Fa-f]{6}"\s*/>', '', content)
-                    content = re.sub(r'<w:color[^>]*w:themeColor="[^"]*"[^>]*/>', '', content)
+                    content = _DOCX_COLOR_RE.sub('', content)
+                    content = _DOCX_THEME_COLOR_RE.sub('', content)
 
                     # Set A4 page size (210mm x 297mm = 11906 x 16838 twips)
                     # with 1 inch margins (1440 twips)
@@ -760,10 +995,9 @@ def _postprocess_docx(docx_bytes: bytes, font_name: str = "Times New Roman", fon
                     )
                     # Replace existing page size settings or add them
                     if '<w:pgSz' in content:
-                        content = re.sub(r'<w:pgSz[^/]*/>', '<w:pgSz w:w="11906" w:h="16838"/>', content)
+                        content = _DOCX_PGSZ_RE.sub('<w:pgSz w:w="11906" w:h="16838"/>', content)
                     if '<w:pgMar' in content:
-                        content = re.sub(
-                            r'<w:pgMar[^/]*/>',
+                        content = _DOCX_PGMAR_RE.sub(
                             '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" '
                             'w:header="720" w:footer="720" w:gutter="0"/>',
                             content
@@ -777,13 +1011,14 @@ def _postprocess_docx(docx_bytes: bytes, font_name: str = "Times New Roman", fon
 
                 elif item.filename == 'word/theme/theme1.xml':
                     content = data.decode('utf-8')
-                    content = re.sub(r'typeface="[^"]*"', f'typeface="{font_name}"', content)
+                    content = _DOCX_TYPEFACE_RE.sub(f'typeface="{font_name}"', content)
                     data = content.encode('utf-8')
 
+                # writestr() hands the whole payload to zlib.crc32 in one call,
+                # so no CRC precomputation is needed here
                 zout.writestr(item, data)
 
-        output_buffer.seek(0)
-        return output_buffer.read()
+    return output_buffer.getvalue()
 
 
 def check_docx_dependencies() -> Tuple[bool, str]:
@@ -1293,6 +1528,8 @@ def _get_relevance_fill(relevance: str):
     return None
 
 
+_EXCEL_SHEET_INVALID_RE = re.compile(r'[\\/\?\*\[\]:]')
+
 def sanitize_excel_sheet_name(name: str, default: str = "Sheet1") -> str:
     """
     Sanitize a string for use as an Excel sheet name.
@@ -1314,8 +1551,7 @@ def sanitize_excel_sheet_name(name: str, default: str = "Sheet1") -> str:
         return default
 
     # Remove invalid characters
-    invalid_chars = r'[\\/\?\*\[\]:]'
-    name = re.sub(invalid_chars, '_', name)
+    name = _EXCEL_SHEET_INVALID_RE.sub('_', name)
 
     # Strip leading/trailing whitespace and apostrophes
     name = name.strip().strip("'")
@@ -1494,121 +1730,166 @@ def get_table_preview(markdown_content: str) -> Optional[Tuple[List[str], int]]:
 
 
 # ---------- HTML Generation ----------
-def get_theme_css(theme_preset: str) -> list:
-    """Get CSS variables for different theme presets."""
-    themes = {
-        "default": [
-            ":root{--bg:#ffffff;--fg:#111111;--muted:#555555;--link:#0b63ce;--linkv:#6a32c9;--border:#dddddd;--code:#f6f8fa;--accent:#eef1f5}",
-            "html[data-theme=\"dark\"]{--bg:#0f1115;--fg:#e6e6e6;--muted:#a0a0a0;--link:#6aa7ff;--linkv:#c39bff;--border:#2a2e37;--code:#1a1d24;--accent:#20232b}",
-        ],
-        "github": [
-            ":root{--bg:#ffffff;--fg:#24292f;--muted:#57606a;--link:#0969da;--linkv:#8250df;--border:#d0d7de;--code:#f6f8fa;--accent:#f6f8fa}",
-            "html[data-theme=\"dark\"]{--bg:#0d1117;--fg:#c9d1d9;--muted:#8b949e;--link:#58a6ff;--linkv:#bc8cff;--border:#30363d;--code:#161b22;--accent:#161b22}",
-        ],
-        "academic": [
-            ":root{--bg:#fffff8;--fg:#1a1a1a;--muted:#666666;--link:#2563eb;--linkv:#7c3aed;--border:#d4d4d4;--code:#f5f5f5;--accent:#fafafa;font-family:Georgia,Cambria,'Times New Roman',Times,serif}",
-            "html[data-theme=\"dark\"]{--bg:#1a1a1a;--fg:#e5e5e5;--muted:#a3a3a3;--link:#60a5fa;--linkv:#a78bfa;--border:#404040;--code:#262626;--accent:#262626}",
-            "body{line-height:1.7}",
-            "main{padding:2rem}",
-        ],
-        "minimal": [
-            ":root{--bg:#ffffff;--fg:#000000;--muted:#666666;--link:#000000;--linkv:#333333;--border:#e0e0e0;--code:#f8f8f8;--accent:#fafafa}",
-            "html[data-theme=\"dark\"]{--bg:#000000;--fg:#ffffff;--muted:#999999;--link:#ffffff;--linkv:#cccccc;--border:#333333;--code:#111111;--accent:#0a0a0a}",
-            "body{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;line-height:1.6}",
-            "a{text-decoration:none;border-bottom:1px solid var(--link)}",
-        ],
-        "dark": [
-            ":root,html{--bg:#1e1e1e;--fg:#d4d4d4;--muted:#858585;--link:#4fc3f7;--linkv:#ba68c8;--border:#3e3e3e;--code:#2d2d2d;--accent:#252526}",
-            "html[data-theme=\"dark\"]{--bg:#1e1e1e;--fg:#d4d4d4;--muted:#858585;--link:#4fc3f7;--linkv:#ba68c8;--border:#3e3e3e;--code:#2d2d2d;--accent:#252526}",
-            "html{color-scheme:dark}",
-        ],
-    }
-    return themes.get(theme_preset, themes["default"])
+# Theme presets: CSS rules per preset, built once at import time
+_THEME_CSS = {
+    "default": (
+        ":root{--bg:#ffffff;--fg:#111111;--muted:#555555;--link:#0b63ce;--linkv:#6a32c9;--border:#dddddd;--code:#f6f8fa;--accent:#eef1f5}",
+        "html[data-theme=\"dark\"]{--bg:#0f1115;--fg:#e6e6e6;--muted:#a0a0a0;--link:#6aa7ff;--linkv:#c39bff;--border:#2a2e37;--code:#1a1d24;--accent:#20232b}",
+    ),
+    "github": (
+        ":root{--bg:#ffffff;--fg:#24292f;--muted:#57606a;--link:#0969da;--linkv:#8250df;--border:#d0d7de;--code:#f6f8fa;--accent:#f6f8fa}",
+        "html[data-theme=\"dark\"]{--bg:#0d1117;--fg:#c9d1d9;--muted:#8b949e;--link:#58a6ff;--linkv:#bc8cff;--border:#30363d;--code:#161b22;--accent:#161b22}",
+    ),
+    "academic": (
+        ":root{--bg:#fffff8;--fg:#1a1a1a;--muted:#666666;--link:#2563eb;--linkv:#7c3aed;--border:#d4d4d4;--code:#f5f5f5;--accent:#fafafa;font-family:Georgia,Cambria,'Times New Roman',Times,serif}",
+        "html[data-theme=\"dark\"]{--bg:#1a1a1a;--fg:#e5e5e5;--muted:#a3a3a3;--link:#60a5fa;--linkv:#a78bfa;--border:#404040;--code:#262626;--accent:#262626}",
+        "body{line-height:1.7}",
+        "main{padding:2rem}",
+    ),
+    "minimal": (
+        ":root{--bg:#ffffff;--fg:#000000;--muted:#666666;--link:#000000;--linkv:#333333;--border:#e0e0e0;--code:#f8f8f8;--accent:#fafafa}",
+        "html[data-theme=\"dark\"]{--bg:#000000;--fg:#ffffff;--muted:#999999;--link:#ffffff;--linkv:#cccccc;--border:#333333;--code:#111111;--accent:#0a0a0a}",
+        "body{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;line-height:1.6}",
+        "a{text-decoration:none;border-bottom:1px solid var(--link)}",
+    ),
+    "dark": (
+        ":root,html{--bg:#1e1e1e;--fg:#d4d4d4;--muted:#858585;--link:#4fc3f7;--linkv:#ba68c8;--border:#3e3e3e;--code:#2d2d2d;--accent:#252526}",
+        "html[data-theme=\"dark\"]{--bg:#1e1e1e;--fg:#d4d4d4;--muted:#858585;--link:#4fc3f7;--linkv:#ba68c8;--border:#3e3e3e;--code:#2d2d2d;--accent:#252526}",
+        "html{color-scheme:dark}",
+    ),
+}
 
-def get_highlight_theme_css(highlight_theme: str) -> str:
-    """Get CSS for syntax highlighting themes."""
-    themes = {
-        "github-light": """
+
+# Syntax highlighting themes: one CSS block per highlight.js theme
+_HIGHLIGHT_THEME_CSS = {
+    "github-light": """
 .hljs{background:#f6f8fa;color:#24292e}.hljs-doctag,.hljs-keyword,.hljs-meta .hljs-keyword,.hljs-template-tag,.hljs-template-variable,.hljs-type,.hljs-variable.language_{color:#d73a49}.hljs-title,.hljs-title.class_,.hljs-title.class_.inherited__,.hljs-title.function_{color:#6f42c1}.hljs-attr,.hljs-attribute,.hljs-literal,.hljs-meta,.hljs-number,.hljs-operator,.hljs-selector-attr,.hljs-selector-class,.hljs-selector-id,.hljs-variable{color:#005cc5}.hljs-meta .hljs-string,.hljs-regexp,.hljs-string{color:#032f62}.hljs-built_in,.hljs-symbol{color:#e36209}.hljs-code,.hljs-comment,.hljs-formula{color:#6a737d}.hljs-name,.hljs-quote,.hljs-selector-pseudo,.hljs-selector-tag{color:#22863a}.hljs-subst{color:#24292e}.hljs-section{color:#005cc5;font-weight:700}.hljs-bullet{color:#735c0f}.hljs-emphasis{color:#24292e;font-style:italic}.hljs-strong{color:#24292e;font-weight:700}.hljs-addition{color:#22863a;background-color:#f0fff4}.hljs-deletion{color:#b31d28;background-color:#ffeef0}
 """,
-        "github-dark": """
+    "github-dark": """
 .hljs{background:#0d1117;color:#c9d1d9}.hljs-doctag,.hljs-keyword,.hljs-meta .hljs-keyword,.hljs-template-tag,.hljs-template-variable,.hljs-type,.hljs-variable.language_{color:#ff7b72}.hljs-title,.hljs-title.class_,.hljs-title.class_.inherited__,.hljs-title.function_{color:#d2a8ff}.hljs-attr,.hljs-attribute,.hljs-literal,.hljs-meta,.hljs-number,.hljs-operator,.hljs-selector-attr,.hljs-selector-class,.hljs-selector-id,.hljs-variable{color:#79c0ff}.hljs-meta .hljs-string,.hljs-regexp,.hljs-string{color:#a5d6ff}.hljs-built_in,.hljs-symbol{color:#ffa657}.hljs-code,.hljs-comment,.hljs-formula{color:#8b949e}.hljs-name,.hljs-quote,.hljs-selector-pseudo,.hljs-selector-tag{color:#7ee787}.hljs-subst{color:#c9d1d9}.hljs-section{color:#1f6feb;font-weight:700}.hljs-bullet{color:#f2cc60}.hljs-emphasis{color:#c9d1d9;font-style:italic}.hljs-strong{color:#c9d1d9;font-weight:700}.hljs-addition{color:#aff5b4;background-color:#033a16}.hljs-deletion{color:#ffdcd7;background-color:#67060c}
 """,
-        "monokai": """
+    "monokai": """
 .hljs{background:#272822;color:#ddd}.hljs-tag,.hljs-keyword,.hljs-selector-tag,.hljs-literal,.hljs-strong,.hljs-name{color:#f92672}.hljs-code{color:#66d9ef}.hljs-class .hljs-title{color:#fff}.hljs-attribute,.hljs-symbol,.hljs-regexp,.hljs-link{color:#bf79db}.hljs-string,.hljs-bullet,.hljs-subst,.hljs-title,.hljs-section,.hljs-emphasis,.hljs-type,.hljs-built_in,.hljs-selector-attr,.hljs-selector-pseudo,.hljs-addition,.hljs-variable,.hljs-template-tag,.hljs-template-variable{color:#a6e22e}.hljs-comment,.hljs-quote,.hljs-deletion,.hljs-meta{color:#75715e}.hljs-keyword,.hljs-selector-tag,.hljs-literal,.hljs-doctag,.hljs-title,.hljs-section,.hljs-type,.hljs-name{font-weight:700}
 """,
-        "atom-one-dark": """
+    "atom-one-dark": """
 .hljs{background:#282c34;color:#abb2bf}.hljs-comment,.hljs-quote{color:#5c6370;font-style:italic}.hljs-doctag,.hljs-keyword,.hljs-formula{color:#c678dd}.hljs-section,.hljs-name,.hljs-selector-tag,.hljs-deletion,.hljs-subst{color:#e06c75}.hljs-literal{color:#56b6c2}.hljs-string,.hljs-regexp,.hljs-addition,.hljs-attribute,.hljs-meta .hljs-string{color:#98c379}.hljs-attr,.hljs-variable,.hljs-template-variable,.hljs-type,.hljs-selector-class,.hljs-selector-attr,.hljs-selector-pseudo,.hljs-number{color:#d19a66}.hljs-symbol,.hljs-bullet,.hljs-link,.hljs-meta,.hljs-selector-id,.hljs-title{color:#61aeee}.hljs-built_in,.hljs-title.class_,.hljs-class .hljs-title{color:#e6c07b}.hljs-emphasis{font-style:italic}.hljs-strong{font-weight:700}.hljs-link{text-decoration:underline}
 """,
-    }
-    return themes.get(highlight_theme, themes["github-light"])
+}
 
-def generate_css(toc_mode: str, back_to_top: bool, search_enabled: bool, collapsible_mode: str, theme_preset: str = "default", highlight_enabled: bool = False, highlight_theme: str = "github-light", line_numbers: bool = False, base_font_size: str = "100%", content_width: str = "900px") -> str:
-    """Generate CSS based on enabled features."""
-    # Validate and sanitize CSS values to prevent injection
-    safe_font_size = sanitize_css_size(base_font_size, "100%")
-    safe_content_width = sanitize_css_size(content_width, "900px")
 
-    base_css = get_theme_css(theme_preset) + [
-        f":root{{--base-font-size:{safe_font_size};--content-width:{safe_content_width}}}",
-        "*{box-sizing:border-box}",
-        f"body{{margin:0;background:var(--bg);color:var(--fg);line-height:1.55;font-family:-apple-system,BlinkMacSystemFont,Segoe UI,Roboto,Ubuntu,Cantarell,Noto Sans,sans-serif;font-size:var(--base-font-size)}}",
-        "a{color:var(--link);text-decoration:underline}a:visited{color:var(--linkv)}a:hover{opacity:.8}",
-        "header.toolbar{position:sticky;top:0;z-index:10;background:var(--bg);border-bottom:1px solid var(--border)}",
-        "header .wrap{max-width:1080px;margin:0 auto;padding:.5rem 1rem;display:flex;gap:.75rem;align-items:center;justify-content:space-between;flex-wrap:wrap}",
-        "main{max-width:var(--content-width);margin:0 auto;padding:1rem}",
-        "nav#toc{border:1px solid var(--border);background:var(--accent);padding:1rem;border-radius:.5rem;margin:1rem 0 2rem 0}",
-        "h1,h2,h3,h4,h5,h6{position:relative;line-height:1.25;margin:1.5rem 0 .75rem 0;scroll-margin-top:80px}",
-        "h1{font-size:2rem}h2{font-size:1.5rem}h3{font-size:1.25rem}",
-        ".heading-anchor{position:absolute;left:-1.5rem;opacity:0;color:var(--muted);text-decoration:none;font-weight:normal;padding:.25rem}",
-        "h1:hover .heading-anchor,h2:hover .heading-anchor,h3:hover .heading-anchor,h4:hover .heading-anchor,h5:hover .heading-anchor,h6:hover .heading-anchor,.heading-anchor:focus{opacity:1}",
-        "p{margin:.75rem 0}",
-        "pre{position:relative;background:var(--code);padding:1rem;overflow:auto;border-radius:.4rem;border:1px solid var(--border);margin:1rem 0}",
-        "pre.output{background:var(--bg);border-left:4px solid var(--muted);border-radius:0 .4rem .4rem 0}",
-        "pre.output code{color:var(--muted)}",
-        "code{background:var(--code);padding:.15rem .3rem;border-radius:.3rem;border:1px solid var(--border);font-family:ui-monospace,SFMono-Regular,Consolas,monospace}",
-        "pre code{background:transparent;padding:0;border:none}",
-        ".code-wrapper{position:relative}",
-        ".copy-btn{position:absolute;top:.5rem;right:.5rem;background:var(--accent);border:1px solid var(--border);color:var(--fg);padding:.25rem .5rem;border-radius:.3rem;cursor:pointer;font-size:.8rem;opacity:.7;transition:opacity .2s;z-index:5}",
-        ".copy-btn:hover{opacity:1}",
-        ".copy-btn.copied{background:var(--link);color:#fff;border-color:var(--link)}",
-        ".table-wrapper{overflow-x:auto;margin:1rem 0;position:relative;box-shadow:inset -10px 0 10px -10px rgba(0,0,0,.1),inset 10px 0 10px -10px rgba(0,0,0,.1)}",
-        ".table-wrapper table{margin:0}",
-        "table{border-collapse:collapse;margin:1rem 0;width:100%}",
-        "th,td{border:1px solid var(--border);padding:.5rem;vertical-align:top;text-align:left}",
-        "th{background:var(--accent);font-weight:600}",
-        "blockquote{border-left:4px solid var(--border);margin:1rem 0;padding:.5rem 1rem;color:var(--muted);background:var(--accent)}",
-        "img{max-width:100%;height:auto}",
-        "ul,ol{margin:.75rem 0;padding-left:2rem}",
-        "li{margin:.25rem 0}",
-        "hr{border:none;border-top:1px solid var(--border);margin:2rem 0}",
-        "hr.labeled{position:relative;text-align:center;margin:3rem 0;border-top:2px solid var(--border)}",
-        "hr.labeled::after{content:attr(data-label);position:absolute;top:50%;left:50%;transform:translate(-50%,-50%);background:var(--bg);padding:0 1rem;color:var(--muted);font-size:.9em;font-weight:600;white-space:nowrap}",
-        "a.skip{position:absolute;left:-10000px;top:auto;width:1px;height:1px;overflow:hidden}",
-        "a.skip:focus{position:static;width:auto;height:auto;margin:.5rem;display:inline-block;background:var(--accent);padding:.4rem .6rem;border-radius:.3rem}",
-        "@media print{html{color-scheme:light}body{font-size:11pt}header.toolbar,button#themeToggle,#tocSidebarToggle,#toc-sidebar,#toc-backdrop,.search-wrap,.copy-btn,.back-to-top,.heading-anchor{display:none!important}pre,table,blockquote,img{page-break-inside:avoid}h1,h2,h3,h4,h5,h6{page-break-after:avoid}a[href^=\"http\"]::after{content:\" (\" attr(href) \")\";font-size:.85em;color:var(--muted);word-break:break-all}main{max-width:100%;padding:.5cm}pre{border:1px solid #ccc;overflow:visible;white-space:pre-wrap}.collapsible::after{display:none}.section-body{display:block!important}}"
-    ]
+def get_theme_css(theme_preset: str) -> list:
+    """Get CSS variables for different theme presets."""
+    # Fresh list per call so callers can extend it without touching the table
+    return list(_THEME_CSS.get(theme_preset, _THEME_CSS["default"]))
+
+def get_highlight_theme_css(highlight_theme: str) -> str:
+    """Get CSS for syntax highlighting themes."""
+    return _HIGHLIGHT_THEME_CSS.get(highlight_theme, _HIGHLIGHT_THEME_CSS["github-light"])
+
+# Feature-independent layout/typography rules, joined once at import time
+_BASE_CSS = "".join((
+    "*{box-sizing:border-box}",
+    "body{margin:0;background:var(--bg);color:var(--fg);line-height:1.55;font-family:-apple-system,BlinkMacSystemFont,Segoe UI,Roboto,Ubuntu,Cantarell,Noto Sans,sans-serif;font-size:var(--base-font-size)}",
+    "a{color:var(--link);text-decoration:underline}a:visited{color:var(--linkv)}a:hover{opacity:.8}",
+    "header.toolbar{position:sticky;top:0;z-index:10;background:var(--bg);border-bottom:1px solid var(--border)}",
+    "header .wrap{max-width:1080px;margin:0 auto;padding:.5rem 1rem;display:flex;gap:.75rem;align-items:center;justify-content:space-between;flex-wrap:wrap}",
+    "main{max-width:var(--content-width);margin:0 auto;padding:1rem}",
+    "nav#toc{border:1px solid var(--border);background:var(--accent);padding:1rem;border-radius:.5rem;margin:1rem 0 2rem 0}",
+    "h1,h2,h3,h4,h5,h6{position:relative;line-height:1.25;margin:1.5rem 0 .75rem 0;scroll-margin-top:80px}",
+    "h1{font-size:2rem}h2{font-size:1.5rem}h3{font-size:1.25rem}",
+    ".heading-anchor{position:absolute;left:-1.5rem;opacity:0;color:var(--muted);text-decoration:none;font-weight:normal;padding:.25rem}",
+    "h1:hover .heading-anchor,h2:hover .heading-anchor,h3:hover .heading-anchor,h4:hover .heading-anchor,h5:hover .heading-anchor,h6:hover .heading-anchor,.heading-anchor:focus{opacity:1}",
+    "p{margin:.75rem 0}",
+    "pre{position:relative;background:var(--code);padding:1rem;overflow:auto;border-radius:.4rem;border:1px solid var(--border);margin:1rem 0}",
+    "pre.output{background:var(--bg);border-left:4px solid var(--muted);border-radius:0 .4rem .4rem 0}",
+    "pre.output code{color:var(--muted)}",
+    "code{background:var(--code);padding:.15rem .3rem;border-radius:.3rem;border:1px solid var(--border);font-family:ui-monospace,SFMono-Regular,Consolas,monospace}",
+    "pre code{background:transparent;padding:0;border:none}",
+    ".code-wrapper{position:relative}",
+    ".copy-btn{position:absolute;top:.5rem;right:.5rem;background:var(--accent);border:1px solid var(--border);color:var(--fg);padding:.25rem .5rem;border-radius:.3rem;cursor:pointer;font-size:.8rem;opacity:.7;transition:opacity .2s;z-index:5}",
+    ".copy-btn:hover{opacity:1}",
+    ".copy-btn.copied{background:var(--link);color:#fff;border-color:var(--link)}",
+    ".table-wrapper{overflow-x:auto;margin:1rem 0;position:relative;box-shadow:inset -10px 0 10px -10px rgba(0,0,0,.1),inset 10px 0 10px -10px rgba(0,0,0,.1)}",
+    ".table-wrapper table{margin:0}",
+    "table{border-collapse:collapse;margin:1rem 0;width:100%}",
+    "th,td{border:1px solid var(--border);padding:.5rem;vertical-align:top;text-align:left}",
+    "th{background:var(--accent);font-weight:600}",
+    "blockquote{border-left:4px solid var(--border);margin:1rem 0;padding:.5rem 1rem;color:var(--muted);background:var(--accent)}",
+    "img{max-width:100%;height:auto}",
+    "ul,ol{margin:.75rem 0;padding-left:2rem}",
+    "li{margin:.25rem 0}",
+    "hr{border:none;border-top:1px solid var(--border);margin:2rem 0}",
+    "hr.labeled{position:relative;text-align:center;margin:3rem 0;border-top:2px solid var(--border)}",
+    "hr.labeled::after{content:attr(data-label);position:absolute;top:50%;left:50%;transform:translate(-50%,-50%);background:var(--bg);padding:0 1rem;color:var(--muted);font-size:.9em;font-weight:600;white-space:nowrap}",
+    "a.skip{position:absolute;left:-10000px;top:auto;width:1px;height:1px;overflow:hidden}",
+    "a.skip:focus{position:static;width:auto;height:auto;margin:.5rem;display:inline-block;background:var(--accent);padding:.4rem .6rem;border-radius:.3rem}",
+    "@media print{html{color-scheme:light}body{font-size:11pt}header.toolbar,button#themeToggle,#tocSidebarToggle,#toc-sidebar,#toc-backdrop,.search-wrap,.copy-btn,.back-to-top,.heading-anchor{display:none!important}pre,table,blockquote,img{page-break-inside:avoid}h1,h2,h3,h4,h5,h6{page-break-after:avoid}a[href^=\"http\"]::after{content:\" (\" attr(href) \")\";font-size:.85em;color:var(--muted);word-break:break-all}main{max-width:100%;padding:.5cm}pre{border:1px solid #ccc;overflow:visible;white-space:pre-wrap}.collapsible::after{display:none}.section-body{display:block!important}}",
+))
+
+# Optional feature rules appended by generate_css
+_BACK_TO_TOP_CSS = ".back-to-top{margin:1rem 0 2rem 0}.back-to-top a{display:inline-block;border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.25rem .5rem;border-radius:.3rem;text-decoration:none}.back-to-top a:hover{opacity:.8}"
+_COLLAPSIBLE_CSS = ".collapsible{cursor:pointer;user-select:none}.collapsible::after{content:\" [-]\";font-weight:normal;color:var(--muted)}.collapsed + .section-body{display:none}.collapsed.collapsible::after{content:\" [+]\"}.section-body{margin-top:.5rem}"
+_SEARCH_CSS = ".search-wrap{display:flex;gap:.5rem;align-items:center;flex-wrap:wrap}#searchBox{min-width:220px;padding:.3rem .5rem;border:1px solid var(--border);border-radius:.3rem;background:var(--bg);color:var(--fg)}#searchBox:focus{outline:2px solid var(--link)}#searchClear{border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.25rem .5rem;border-radius:.3rem;cursor:pointer}#searchClear:hover{opacity:.8}mark.hl{background:#ffe58f;padding:0 .1rem;border-radius:.1rem}"
+_SIDEBAR_TOC_CSS = "#tocSidebarToggle{border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.4rem .7rem;border-radius:.4rem;cursor:pointer;margin-left:.5rem}#tocSidebarToggle:hover{opacity:.8}#toc-sidebar{position:fixed;left:0;top:0;height:100vh;width:320px;max-width:85vw;background:var(--bg);color:var(--fg);border-right:1px solid var(--border);transform:translateX(-100%);transition:transform .2s ease;z-index:1000;box-shadow:2px 0 8px rgba(0,0,0,.15)}#toc-sidebar.open{transform:translateX(0)}#toc-sidebar .toc-header{display:flex;align-items:center;justify-content:space-between;padding:.75rem 1rem;border-bottom:1px solid var(--border)}#toc-sidebar ol{margin:0;padding:1rem 1.25rem 2rem 1.75rem;overflow:auto;height:calc(100vh - 60px)}#toc-sidebar ol a{display:block;padding:.25rem 0}#tocSidebarClose{border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.2rem .5rem;border-radius:.3rem;cursor:pointer}#tocSidebarClose:hover{opacity:.8}#toc-backdrop{position:fixed;inset:0;background:rgba(0,0,0,.25);z-index:900}#toc-backdrop.hidden{display:none}"
+_LINE_NUMBERS_CSS = "pre.line-numbers{padding-left:3.5rem}pre.line-numbers code{display:block;position:relative}pre.line-numbers .line-numbers-rows{position:absolute;pointer-events:none;top:1rem;left:0;width:3rem;font-family:ui-monospace,SFMono-Regular,Consolas,monospace;font-size:1em;line-height:1.5;letter-spacing:normal;border-right:1px solid var(--border);user-select:none;counter-reset:linenumber}pre.line-numbers .line-numbers-rows>span{display:block;counter-increment:linenumber;text-align:right;padding-right:.5rem;color:var(--muted)}pre.line-numbers .line-numbers-rows>span:before{content:counter(linenumber)}pre code{line-height:1.5}@media print{pre.line-numbers .line-numbers-rows{border-right-color:#999}}"
+
+@lru_cache(maxsize=64)
+def _assemble_css(
+    theme_preset: str,
+    safe_font_size: str,
+    safe_content_width: str,
+    back_to_top: bool,
+    collapsible: bool,
+    search_enabled: bool,
+    sidebar_toc: bool,
+    line_numbers: bool,
+    highlight_css: Optional[str]
+) -> str:
+    """Join the stylesheet for already-validated sizes and feature flags.
+
+    highlight_css is the resolved syntax-highlighting CSS, or None when
+    highlighting is disabled.
+    """
+    base_css = get_theme_css(theme_preset)
+    base_css.append(f":root{{--base-font-size:{safe_font_size};--content-width:{safe_content_width}}}")
+    base_css.append(_BASE_CSS)
 
     if back_to_top:
-        base_css.append(".back-to-top{margin:1rem 0 2rem 0}.back-to-top a{display:inline-block;border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.25rem .5rem;border-radius:.3rem;text-decoration:none}.back-to-top a:hover{opacity:.8}")
+        base_css.append(_BACK_TO_TOP_CSS)
 
-    if collapsible_mode != "none":
-        base_css.append(".collapsible{cursor:pointer;user-select:none}.collapsible::after{content:\" [-]\";font-weight:normal;color:var(--muted)}.collapsed + .section-body{display:none}.collapsed.collapsible::after{content:\" [+]\"}.section-body{margin-top:.5rem}")
+    if collapsible:
+        base_css.append(_COLLAPSIBLE_CSS)
 
     if search_enabled:
-        base_css.append(".search-wrap{display:flex;gap:.5rem;align-items:center;flex-wrap:wrap}#searchBox{min-width:220px;padding:.3rem .5rem;border:1px solid var(--border);border-radius:.3rem;background:var(--bg);color:var(--fg)}#searchBox:focus{outline:2px solid var(--link)}#searchClear{border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.25rem .5rem;border-radius:.3rem;cursor:pointer}#searchClear:hover{opacity:.8}mark.hl{background:#ffe58f;padding:0 .1rem;border-radius:.1rem}")
+        base_css.append(_SEARCH_CSS)
 
-    if toc_mode == "sidebar":
-        base_css.append("#tocSidebarToggle{border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.4rem .7rem;border-radius:.4rem;cursor:pointer;margin-left:.5rem}#tocSidebarToggle:hover{opacity:.8}#toc-sidebar{position:fixed;left:0;top:0;height:100vh;width:320px;max-width:85vw;background:var(--bg);color:var(--fg);border-right:1px solid var(--border);transform:translateX(-100%);transition:transform .2s ease;z-index:1000;box-shadow:2px 0 8px rgba(0,0,0,.15)}#toc-sidebar.open{transform:translateX(0)}#toc-sidebar .toc-header{display:flex;align-items:center;justify-content:space-between;padding:.75rem 1rem;border-bottom:1px solid var(--border)}#toc-sidebar ol{margin:0;padding:1rem 1.25rem 2rem 1.75rem;overflow:auto;height:calc(100vh - 60px)}#toc-sidebar ol a{display:block;padding:.25rem 0}#tocSidebarClose{border:1px solid var(--border);background:var(--accent);color:var(--fg);padding:.2rem .5rem;border-radius:.3rem;cursor:pointer}#tocSidebarClose:hover{opacity:.8}#toc-backdrop{position:fixed;inset:0;background:rgba(0,0,0,.25);z-index:900}#toc-backdrop.hidden{display:none}")
+    if sidebar_toc:
+        base_css.append(_SIDEBAR_TOC_CSS)
 
     if line_numbers:
-        base_css.append("pre.line-numbers{padding-left:3.5rem}pre.line-numbers code{display:block;position:relative}pre.line-numbers .line-numbers-rows{position:absolute;pointer-events:none;top:1rem;left:0;width:3rem;font-family:ui-monospace,SFMono-Regular,Consolas,monospace;font-size:1em;line-height:1.5;letter-spacing:normal;border-right:1px solid var(--border);user-select:none;counter-reset:linenumber}pre.line-numbers .line-numbers-rows>span{display:block;counter-increment:linenumber;text-align:right;padding-right:.5rem;color:var(--muted)}pre.line-numbers .line-numbers-rows>span:before{content:counter(linenumber)}pre code{line-height:1.5}@media print{pre.line-numbers .line-numbers-rows{border-right-color:#999}}")
+        base_css.append(_LINE_NUMBERS_CSS)
 
-    if highlight_enabled:
-        base_css.append(get_highlight_theme_css(highlight_theme))
+    if highlight_css is not None:
+        base_css.append(highlight_css)
 
     return "".join(base_css)
 
+def generate_css(toc_mode: str, back_to_top: bool, search_enabled: bool, collapsible_mode: str, theme_preset: str = "default", highlight_enabled: bool = False, highlight_theme: str = "github-light", line_numbers: bool = False, base_font_size: str = "100%", content_width: str = "900px") -> str:
+    """Generate CSS based on enabled features."""
+    # Validate and sanitize CSS values to prevent injection
+    safe_font_size = sanitize_css_size(base_font_size, "100%")
+    safe_content_width = sanitize_css_size(content_width, "900px")
+
+    # Validation (and its warnings) stays outside the cache; assembly is
+    # specialized per distinct option combination
+    return _assemble_css(
+        theme_preset, safe_font_size, safe_content_width,
+        bool(back_to_top), collapsible_mode != "none", bool(search_enabled),
+        toc_mode == "sidebar", bool(line_numbers),
+        # Resolve the theme (with its github-light fallback) before caching
+        get_highlight_theme_css(highlight_theme) if highlight_enabled else None,
+    )
+
 def generate_toolbar(title: str, toc_mode: str, search_enabled: bool, theme_preset: str = "Default") -> str:
     """Generate toolbar HTML."""
     sidebar_toggle = (
@@ -1665,24 +1946,19 @@ def generate_toc_containers(toc_mode: str) -> Tuple[str, str]:
     )
     return top_toc, sidebar_toc
 
-def generate_javascript(
-    vendor_libs: dict,
+@lru_cache(maxsize=64)
+def _generate_inline_script(
     toc_mode: str,
     toc_levels: str,
     collapsible_mode: str,
     start_collapsed: bool,
     back_to_top: bool,
     search_enabled: bool,
-    highlight_enabled: bool = False,
-    katex_enabled: bool = False,
-    line_numbers: bool = False
+    include_highlight: bool,
+    line_numbers: bool,
+    include_katex: bool
 ) -> str:
-    """Generate JavaScript code with constants."""
-    marked_js = vendor_libs.get("marked", "")
-    purify_js = vendor_libs.get("purify", "")
-    highlight_js = vendor_libs.get("highlight", "")
-    katex_js = vendor_libs.get("katex_js", "")
-
+    """Generate the inline <script> with constants and page behavior."""
     toc_mode_js = {"top": "'top'", "sidebar": "'sidebar'", "none": "'none'"}.get(toc_mode, "'none'")
     toc_levels_js = {"h2": "'h2'", "h2h3": "'h2h3'", "h2h3h4": "'h2h3h4'"}.get(toc_levels, "'h2'")
     collapse_mode_js = {"none": "'none'", "h2": "'h2'", "h2h3": "'h2h3'"}.get(collapsible_mode, "'none'")
@@ -2126,7 +2402,7 @@ def generate_javascript(
 """
 
     # Add syntax highlighting initialization
-    if highlight_enabled and highlight_js:
+    if include_highlight:
         main_js += """
   // Initialize syntax highlighting
   if (window.hljs){
@@ -2169,7 +2445,7 @@ def generate_javascript(
 """
 
     # Add KaTeX math rendering
-    if katex_enabled and katex_js:
+    if include_katex:
         main_js += """
   // Render LaTeX/Math with KaTeX
   if (window.katex){
@@ -2248,6 +2524,26 @@ def generate_javascript(
   }
 """
 
+    return f"  <script>\n(function(){{\n{js_constants}\n{main_js}}})();\n  </script>"
+
+def generate_javascript(
+    vendor_libs: dict,
+    toc_mode: str,
+    toc_levels: str,
+    collapsible_mode: str,
+    start_collapsed: bool,
+    back_to_top: bool,
+    search_enabled: bool,
+    highlight_enabled: bool = False,
+    katex_enabled: bool = False,
+    line_numbers: bool = False
+) -> str:
+    """Generate JavaScript code with constants."""
+    marked_js = vendor_libs.get("marked", "")
+    purify_js = vendor_libs.get("purify", "")
+    highlight_js = vendor_libs.get("highlight", "")
+    katex_js = vendor_libs.get("katex_js", "")
+
     # Build script tags
     scripts = []
     scripts.append(f"  <script>\n{marked_js}\n  </script>")
@@ -2259,7 +2555,13 @@ def generate_javascript(
     if katex_enabled and katex_js:
         scripts.append(f"  <script>\n{katex_js}\n  </script>")
 
-    scripts.append(f"  <script>\n(function(){{\n{js_constants}\n{main_js}}})();\n  </script>")
+    # The inline script depends only on the feature flags, so it is cached
+    scripts.append(_generate_inline_script(
+        toc_mode, toc_levels, collapsible_mode, bool(start_collapsed),
+        bool(back_to_top), bool(search_enabled),
+        bool(highlight_enabled and highlight_js), bool(line_numbers),
+        bool(katex_enabled and katex_js),
+    ))
 
     return "\n".join(scripts)
 
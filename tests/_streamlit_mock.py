@@ -0,0 +1,72 @@
+"""
+Streamlit mock shared by the md_converter tests.
+
+md_converter builds its Streamlit UI at import time, so a streamlit mock must
+be in sys.modules before it is imported. Importing this module installs the
+mock (once; later imports reuse it). Both conftest.py and the test files import
+it, so the files also run directly with ``python tests/test_*.py``; those put
+the repository root on sys.path before importing it.
+"""
+import sys
+from unittest.mock import MagicMock
+
+# Create comprehensive streamlit mock before importing md_converter
+mock_st = MagicMock()
+# columns() returns variable number based on input; column mocks come from a
+# shared pool since tests only exercise call sites, not column identity
+_COLUMN_POOL = [MagicMock() for _ in range(32)]
+def mock_columns(num_cols, **kwargs):
+    n = len(num_cols) if isinstance(num_cols, list) else num_cols
+    if n <= len(_COLUMN_POOL):
+        return _COLUMN_POOL[:n]
+    return [MagicMock() for _ in range(n)]
+mock_st.columns = mock_columns
+
+
+class _NoopCM:
+    """Stand-in for st.container/st.expander: a context manager that absorbs any use."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __getattr__(self, _name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+_NOOP_CM = _NoopCM()
+mock_st.container = mock_st.expander = lambda *args, **kwargs: _NOOP_CM
+mock_st.set_page_config = MagicMock()
+mock_st.title = MagicMock()
+mock_st.caption = MagicMock()
+mock_st.radio = MagicMock(return_value="Single Markdown File")
+mock_st.file_uploader = MagicMock(return_value=None)
+mock_st.text_area = MagicMock(return_value="")
+mock_st.text_input = MagicMock(return_value="")
+mock_st.selectbox = MagicMock(return_value="Default")
+mock_st.toggle = MagicMock(return_value=True)
+mock_st.button = MagicMock(return_value=False)
+mock_st.divider = MagicMock()
+mock_st.subheader = MagicMock()
+mock_st.markdown = MagicMock()
+mock_st.session_state = {}
+# cache_data can be used as @st.cache_data or @st.cache_data(...)
+def mock_cache_data(func=None, **kwargs):
+    if func is not None:
+        return func
+    return lambda f: f
+mock_st.cache_data = mock_cache_data
+mock_st.error = MagicMock()
+mock_st.warning = MagicMock()
+mock_st.success = MagicMock()
+mock_st.info = MagicMock()
+mock_st.stop = MagicMock(side_effect=SystemExit)
+
+sys.modules['streamlit'] = mock_st
+sys.modules['streamlit.components'] = MagicMock()
+sys.modules['streamlit.components.v1'] = MagicMock()
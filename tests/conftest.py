@@ -0,0 +1,7 @@
+"""
+Shared pytest configuration for md_converter tests.
+
+Importing the streamlit mock here installs it once per session, before test
+collection; see tests/_streamlit_mock.py.
+"""
+from tests import _streamlit_mock  # noqa: F401  (installs the streamlit mock)
@@ -11,50 +11,11 @@ These tests go even deeper than standard security tests:
 import os
 import sys
 import tempfile
-from unittest.mock import MagicMock
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Create comprehensive streamlit mock before importing md_converter
-mock_st = MagicMock()
-def mock_columns(num_cols, **kwargs):
-    if isinstance(num_cols, list):
-        return [MagicMock() for _ in num_cols]
-    return [MagicMock() for _ in range(num_cols)]
-mock_st.columns = mock_columns
-mock_st.container.return_value.__enter__ = MagicMock(return_value=MagicMock())
-mock_st.container.return_value.__exit__ = MagicMock(return_value=False)
-mock_st.set_page_config = MagicMock()
-mock_st.title = MagicMock()
-mock_st.caption = MagicMock()
-mock_st.radio = MagicMock(return_value="Single Markdown File")
-mock_st.file_uploader = MagicMock(return_value=None)
-mock_st.text_area = MagicMock(return_value="")
-mock_st.text_input = MagicMock(return_value="")
-mock_st.selectbox = MagicMock(return_value="Default")
-mock_st.toggle = MagicMock(return_value=True)
-mock_st.button = MagicMock(return_value=False)
-mock_st.divider = MagicMock()
-mock_st.subheader = MagicMock()
-mock_st.markdown = MagicMock()
-mock_st.session_state = {}
-def mock_cache_data(func=None, **kwargs):
-    if func is not None:
-        return func
-    return lambda f: f
-mock_st.cache_data = mock_cache_data
-mock_st.error = MagicMock()
-mock_st.warning = MagicMock()
-mock_st.success = MagicMock()
-mock_st.info = MagicMock()
-mock_st.stop = MagicMock(side_effect=SystemExit)
-mock_st.expander.return_value.__enter__ = MagicMock(return_value=MagicMock())
-mock_st.expander.return_value.__exit__ = MagicMock(return_value=False)
-
-sys.modules['streamlit'] = mock_st
-sys.modules['streamlit.components'] = MagicMock()
-sys.modules['streamlit.components.v1'] = MagicMock()
+from tests import _streamlit_mock  # noqa: F401  (installs the streamlit mock)
 
 from md_converter import (
     validate_vendor_path,
@@ -321,6 +282,31 @@ class TestConcurrencyIssues:
         # Documenting for manual security review
         pass
 
+    def test_retargeted_base_symlink_blocked(self):
+        """Test that the base is re-resolved after its symlink is retargeted."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data = os.path.join(tmpdir, "data")
+            proj_real = os.path.join(data, "proj_real")
+            os.makedirs(proj_real)
+            with open(os.path.join(data, "secret.md"), "w") as f:
+                f.write("SECRET")
+            with open(os.path.join(proj_real, "chapter.md"), "w") as f:
+                f.write("chapter")
+
+            # Base first points at data itself, so chapter reads resolve there
+            proj = os.path.join(data, "proj")
+            os.symlink(data, proj)
+            safe_read_file(proj, "secret.md")
+
+            # Retarget the base one level deeper; ../secret.md is now outside it
+            os.remove(proj)
+            os.symlink(proj_real, proj)
+            try:
+                safe_read_file(proj, "../secret.md")
+                assert False, "Read outside the retargeted base should be blocked"
+            except ValueError as e:
+                assert "Security violation" in str(e)
+
 
 class TestDOCXEdgeCases:
     """Test DOCX conversion edge cases."""
@@ -6,6 +6,8 @@ Tests DOCX conversion utilities.
 import unittest
 import sys
 import os
+import io
+import zipfile
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,6 +15,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import md_converter
 
 
+def _build_minimal_docx() -> bytes:
+    """Build a minimal DOCX (ZIP) archive with the parts _postprocess_docx touches."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        zf.writestr('[Content_Types].xml', '<?xml version="1.0"?><Types></Types>')
+        zf.writestr('word/document.xml', '<?xml version="1.0"?><document></document>')
+        zf.writestr('word/styles.xml', '<?xml version="1.0"?><styles></styles>')
+    return buffer.getvalue()
+
+
 class TestPreprocessMarkdownForDocx(unittest.TestCase):
     """Test markdown preprocessing for DOCX conversion."""
 
@@ -46,25 +58,17 @@ class TestPreprocessMarkdownForDocx(unittest.TestCase):
 class TestSanitizeFilenameForFormat(unittest.TestCase):
     """Test filename sanitization for different formats."""
 
-    def test_basic_docx(self):
-        """Test basic DOCX filename."""
-        result = md_converter.sanitize_filename_for_format("test", ".docx")
-        self.assertEqual(result, "test.docx")
-
-    def test_removes_existing_extension(self):
-        """Test existing extension is removed."""
-        result = md_converter.sanitize_filename_for_format("test.md", ".docx")
-        self.assertEqual(result, "test.docx")
-
-    def test_empty_name(self):
-        """Test empty name gets default."""
-        result = md_converter.sanitize_filename_for_format("", ".docx")
-        self.assertEqual(result, "document.docx")
-
-    def test_special_chars_removed(self):
-        """Test special characters are removed."""
-        result = md_converter.sanitize_filename_for_format("test<>file", ".docx")
-        self.assertEqual(result, "testfile.docx")
+    def test_sanitize_cases(self):
+        """Test basic names, extension stripping, defaults and special characters."""
+        cases = [
+            ("test", ".docx", "test.docx"),
+            ("test.md", ".docx", "test.docx"),
+            ("", ".docx", "document.docx"),
+            ("test<>file", ".docx", "testfile.docx"),
+        ]
+        for name, ext, expected in cases:
+            with self.subTest(name=name, ext=ext):
+                self.assertEqual(md_converter.sanitize_filename_for_format(name, ext), expected)
 
     def test_byte_limit_respected(self):
         """Test filename respects byte limits."""
@@ -75,48 +79,50 @@ class TestSanitizeFilenameForFormat(unittest.TestCase):
         self.assertLessEqual(len(result.encode('utf-8')), 255)
         self.assertTrue(result.endswith('.docx'))
 
+    def test_long_names_not_cached(self):
+        """Test names longer than the filename limit bypass the memo cache."""
+        before = md_converter.sanitize_filename_for_format.cache_info().currsize
+        result = md_converter.sanitize_filename_for_format("a" * 10000, ".docx")
+        self.assertEqual(result, "a" * 250 + ".docx")
+        self.assertEqual(md_converter.sanitize_filename_for_format.cache_info().currsize, before)
+
 
 class TestCheckDocxDependencies(unittest.TestCase):
     """Test dependency checking."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Check dependencies once; the result does not change between tests."""
+        cls.deps = md_converter.check_docx_dependencies()
+
     def test_returns_tuple(self):
         """Test function returns a tuple."""
-        result = md_converter.check_docx_dependencies()
-        self.assertIsInstance(result, tuple)
-        self.assertEqual(len(result), 2)
+        self.assertIsInstance(self.deps, tuple)
+        self.assertEqual(len(self.deps), 2)
 
     def test_first_element_is_bool(self):
         """Test first element is boolean."""
-        available, error = md_converter.check_docx_dependencies()
+        available, error = self.deps
         self.assertIsInstance(available, bool)
 
     def test_second_element_is_string(self):
         """Test second element is string."""
-        available, error = md_converter.check_docx_dependencies()
+        available, error = self.deps
         self.assertIsInstance(error, str)
 
 
 class TestPostprocessDocx(unittest.TestCase):
     """Test DOCX post-processing."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the minimal DOCX fixture once for all tests."""
+        cls.docx_bytes = _build_minimal_docx()
+
     def test_valid_docx_structure(self):
         """Test post-processing preserves valid DOCX structure."""
-        import zipfile
-        import io
-
-        # Create a minimal valid DOCX structure
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, 'w') as zf:
-            # Add minimal required files
-            zf.writestr('[Content_Types].xml', '<?xml version="1.0"?><Types></Types>')
-            zf.writestr('word/document.xml', '<?xml version="1.0"?><document></document>')
-            zf.writestr('word/styles.xml', '<?xml version="1.0"?><styles></styles>')
-
-        buffer.seek(0)
-        docx_bytes = buffer.read()
-
         # Post-process should not crash
-        result = md_converter._postprocess_docx(docx_bytes)
+        result = md_converter._postprocess_docx(self.docx_bytes)
 
         # Result should be valid ZIP
         result_buffer = io.BytesIO(result)
@@ -13,6 +13,23 @@ import md_converter
 
 class TestExtendedMdConverter(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        """Create one temp directory shared by the file-based tests."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmpdir = cls._tmp.name
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def _write_temp(self, content):
+        """Write content to a per-test file in the shared temp directory."""
+        path = os.path.join(self.tmpdir, f"{self._testMethodName}.md")
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
     def test_parse_markdown_tables_basic(self):
         """Test parsing a simple markdown table."""
         content = """
@@ -100,37 +117,23 @@ class TestExtendedMdConverter(unittest.TestCase):
     - [Chapter 1.1.1](ch1_1_1.md)
 - [Chapter 2](ch2.md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            f.write(content)
-            temp_path = f.name
-        
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            self.assertEqual(len(chapters), 4)
-            self.assertEqual(chapters[0].title, "Chapter 1")
-            self.assertEqual(chapters[0].level, 0)
-            self.assertEqual(chapters[1].title, "Chapter 1.1")
-            self.assertEqual(chapters[1].level, 1)
-            self.assertEqual(chapters[2].title, "Chapter 1.1.1")
-            self.assertEqual(chapters[2].level, 2)
-        finally:
-            os.remove(temp_path)
+        chapters = md_converter.parse_summary_md(self._write_temp(content))
+        self.assertEqual(len(chapters), 4)
+        self.assertEqual(chapters[0].title, "Chapter 1")
+        self.assertEqual(chapters[0].level, 0)
+        self.assertEqual(chapters[1].title, "Chapter 1.1")
+        self.assertEqual(chapters[1].level, 1)
+        self.assertEqual(chapters[2].title, "Chapter 1.1.1")
+        self.assertEqual(chapters[2].level, 2)
 
     def test_parse_summary_md_parens_in_path(self):
         """Test parsing SUMMARY.md with parentheses in filenames."""
         content = """
 - [Title](path/with/(parens).md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            f.write(content)
-            temp_path = f.name
-            
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            self.assertEqual(len(chapters), 1)
-            self.assertEqual(chapters[0].path, "path/with/(parens).md")
-        finally:
-            os.remove(temp_path)
+        chapters = md_converter.parse_summary_md(self._write_temp(content))
+        self.assertEqual(len(chapters), 1)
+        self.assertEqual(chapters[0].path, "path/with/(parens).md")
 
     def test_validate_project_path_security(self):
         """Test validate_project_path rejects sensitive paths."""
@@ -5,101 +5,76 @@ Tests security features, input validation, and core functionality.
 """
 import os
 import sys
+import tempfile
 import unittest
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Create comprehensive streamlit mock before importing md_converter
-mock_st = MagicMock()
-# columns() returns variable number based on input
-def mock_columns(num_cols, **kwargs):
-    if isinstance(num_cols, list):
-        return [MagicMock() for _ in num_cols]
-    return [MagicMock() for _ in range(num_cols)]
-mock_st.columns = mock_columns
-mock_st.container.return_value.__enter__ = MagicMock(return_value=MagicMock())
-mock_st.container.return_value.__exit__ = MagicMock(return_value=False)
-mock_st.set_page_config = MagicMock()
-mock_st.title = MagicMock()
-mock_st.caption = MagicMock()
-mock_st.radio = MagicMock(return_value="Single Markdown File")
-mock_st.file_uploader = MagicMock(return_value=None)
-mock_st.text_area = MagicMock(return_value="")
-mock_st.text_input = MagicMock(return_value="")
-mock_st.selectbox = MagicMock(return_value="Default")
-mock_st.toggle = MagicMock(return_value=True)
-mock_st.button = MagicMock(return_value=False)
-mock_st.divider = MagicMock()
-mock_st.subheader = MagicMock()
-mock_st.markdown = MagicMock()
-mock_st.session_state = {}
-# cache_data can be used as @st.cache_data or @st.cache_data(...)
-def mock_cache_data(func=None, **kwargs):
-    if func is not None:
-        return func
-    return lambda f: f
-mock_st.cache_data = mock_cache_data
-mock_st.error = MagicMock()
-mock_st.warning = MagicMock()
-mock_st.success = MagicMock()
-mock_st.info = MagicMock()
-mock_st.stop = MagicMock(side_effect=SystemExit)
-mock_st.expander.return_value.__enter__ = MagicMock(return_value=MagicMock())
-mock_st.expander.return_value.__exit__ = MagicMock(return_value=False)
-
-sys.modules['streamlit'] = mock_st
-sys.modules['streamlit.components'] = MagicMock()
-sys.modules['streamlit.components.v1'] = MagicMock()
+from tests import _streamlit_mock  # noqa: F401  (installs the streamlit mock)
 
 import md_converter
 
+# One temp root for every file-based test in this module
+_tmp_root = None
 
-class TestEscapeHtml(unittest.TestCase):
-    """Test HTML escaping function."""
 
-    def test_escape_html_basic(self):
-        """Test basic HTML character escaping."""
-        self.assertEqual(md_converter.escape_html("<script>"), "&lt;script&gt;")
-        self.assertEqual(md_converter.escape_html("a & b"), "a &amp; b")
-        self.assertEqual(md_converter.escape_html('"test"'), "&quot;test&quot;")
-        self.assertEqual(md_converter.escape_html("'test'"), "&#x27;test&#x27;")
+def setUpModule():
+    global _tmp_root
+    _tmp_root = tempfile.TemporaryDirectory()
 
-    def test_escape_html_empty(self):
-        """Test empty string handling."""
-        self.assertEqual(md_converter.escape_html(""), "")
-        self.assertEqual(md_converter.escape_html(None), "")
 
-    def test_escape_html_combined(self):
-        """Test combined special characters."""
-        input_str = '<a href="test">click & go</a>'
-        expected = "&lt;a href=&quot;test&quot;&gt;click &amp; go&lt;/a&gt;"
-        self.assertEqual(md_converter.escape_html(input_str), expected)
+def tearDownModule():
+    _tmp_root.cleanup()
 
 
-class TestEscapeForScriptTag(unittest.TestCase):
-    """Test script tag content escaping."""
+class _TempDirMixin:
+    """Give each test its own subdirectory of the module temp root as self.tmp_dir."""
 
-    def test_escape_script_tag_closing(self):
-        """Test closing script tag escaping."""
-        # Standard closing tag
-        self.assertEqual(md_converter.escape_for_script_tag("</script>"), "<\\/script>")
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = os.path.join(_tmp_root.name, f"{type(self).__name__}.{self._testMethodName}")
+        os.mkdir(self.tmp_dir)
 
-        # Case-insensitive replacement - preserves original case
-        result_upper = md_converter.escape_for_script_tag("</SCRIPT>")
-        self.assertEqual(result_upper, "<\\/SCRIPT>")
 
-        result_mixed = md_converter.escape_for_script_tag("</Script>")
-        self.assertEqual(result_mixed, "<\\/Script>")
+class TestEscapeHtml(unittest.TestCase):
+    """Test HTML escaping function."""
 
-        # Broken/Incomplete tags that might still be dangerous
-        self.assertEqual(md_converter.escape_for_script_tag("</script/foo>"), "<\\/script/foo>")
+    def test_escape_html_cases(self):
+        """Test basic, combined and empty-input HTML escaping."""
+        cases = [
+            ("<script>", "&lt;script&gt;"),
+            ("a & b", "a &amp; b"),
+            ('"test"', "&quot;test&quot;"),
+            ("'test'", "&#x27;test&#x27;"),
+            ('<a href="test">click & go</a>',
+             "&lt;a href=&quot;test&quot;&gt;click &amp; go&lt;/a&gt;"),
+            ("", ""),
+            (None, ""),
+        ]
+        for inp, expected in cases:
+            with self.subTest(inp=inp):
+                self.assertEqual(md_converter.escape_html(inp), expected)
 
-    def test_escape_script_tag_empty(self):
-        """Test empty string handling."""
-        self.assertEqual(md_converter.escape_for_script_tag(""), "")
-        self.assertEqual(md_converter.escape_for_script_tag(None), "")
+
+class TestEscapeForScriptTag(unittest.TestCase):
+    """Test script tag content escaping."""
+
+    def test_escape_script_tag_cases(self):
+        """Test closing-tag escaping (case preserved) and empty input."""
+        cases = [
+            ("</script>", "<\\/script>"),
+            ("</SCRIPT>", "<\\/SCRIPT>"),
+            ("</Script>", "<\\/Script>"),
+            # Broken/Incomplete tags that might still be dangerous
+            ("</script/foo>", "<\\/script/foo>"),
+            ("", ""),
+            (None, ""),
+        ]
+        for inp, expected in cases:
+            with self.subTest(inp=inp):
+                self.assertEqual(md_converter.escape_for_script_tag(inp), expected)
 
 
 class TestSanitizeForHtmlComment(unittest.TestCase):
@@ -142,6 +117,9 @@ class TestValidateCssSize(unittest.TestCase):
         self.assertFalse(md_converter.validate_css_size("100pt"))
         self.assertFalse(md_converter.validate_css_size("url(evil.css)"))
         self.assertFalse(md_converter.validate_css_size("100%; injection"))
+        self.assertFalse(md_converter.validate_css_size("16px\n"))
+        self.assertFalse(md_converter.validate_css_size("\u0661\u0666px"))
+        self.assertFalse(md_converter.validate_css_size("1" * 40 + "px"))
 
     def test_validate_css_size_injection(self):
         """Test CSS injection attempts."""
@@ -217,6 +195,8 @@ class TestValidateVendorPath(unittest.TestCase):
 class TestValidateProjectPath(unittest.TestCase):
     """Test project path validation."""
 
+    SENSITIVE_DIRS = ("/etc", "/var", "/root", "/sys", "/proc", "/dev", "/boot")
+
     def test_validate_project_path_valid(self):
         """Test valid project paths."""
         is_valid, error = md_converter.validate_project_path("/home/user/project")
@@ -231,8 +211,7 @@ class TestValidateProjectPath(unittest.TestCase):
 
     def test_validate_project_path_sensitive(self):
         """Test sensitive directory blocking."""
-        sensitive_dirs = ["/etc", "/var", "/root", "/sys", "/proc", "/dev", "/boot"]
-        for path in sensitive_dirs:
+        for path in self.SENSITIVE_DIRS:
             is_valid, error = md_converter.validate_project_path(path)
             self.assertFalse(is_valid, f"Should block {path}")
 
@@ -255,10 +234,11 @@ class TestSafeReadFile(unittest.TestCase):
 class TestGetThemeCss(unittest.TestCase):
     """Test theme CSS generation."""
 
+    THEMES = ("default", "github", "academic", "minimal", "dark")
+
     def test_get_theme_css_valid_themes(self):
         """Test valid theme names."""
-        themes = ["default", "github", "academic", "minimal", "dark"]
-        for theme in themes:
+        for theme in self.THEMES:
             result = md_converter.get_theme_css(theme)
             self.assertIsInstance(result, list)
             self.assertGreater(len(result), 0)
@@ -308,6 +288,18 @@ class TestGenerateCss(unittest.TestCase):
         self.assertIn("--base-font-size:100%", css)
         self.assertIn("--content-width:900px", css)
 
+    def test_generate_css_highlight_theme_none_falls_back(self):
+        """Test enabled highlighting with no theme falls back to github-light."""
+        css = md_converter.generate_css(
+            toc_mode="top",
+            back_to_top=False,
+            search_enabled=False,
+            collapsible_mode="none",
+            highlight_enabled=True,
+            highlight_theme=None,
+        )
+        self.assertIn(md_converter.get_highlight_theme_css("github-light"), css)
+
 
 class TestGenerateToolbar(unittest.TestCase):
     """Test toolbar generation."""
@@ -367,6 +359,14 @@ class TestChapterParsing(unittest.TestCase):
         self.assertIn("Test", repr_str)
         self.assertIn("test.md", repr_str)
 
+    def test_chapter_uses_slots(self):
+        """Test Chapter has no per-instance __dict__ and keeps all fields."""
+        chapter = md_converter.Chapter("Part", is_separator=True, is_part_title=True)
+        self.assertFalse(hasattr(chapter, "__dict__"))
+        self.assertTrue(chapter.is_separator)
+        self.assertTrue(chapter.is_part_title)
+        self.assertEqual(chapter.children, [])
+
 
 class TestSanitizeFilenameExtended(unittest.TestCase):
     """Extended tests for filename sanitization including truncation."""
@@ -532,10 +532,11 @@ class TestBuildHtml(unittest.TestCase):
 class TestHighlightThemeCss(unittest.TestCase):
     """Test syntax highlighting theme CSS."""
 
+    THEMES = ("github-light", "github-dark", "monokai", "atom-one-dark")
+
     def test_get_highlight_theme_css_valid(self):
         """Test valid highlight themes return CSS."""
-        themes = ["github-light", "github-dark", "monokai", "atom-one-dark"]
-        for theme in themes:
+        for theme in self.THEMES:
             css = md_converter.get_highlight_theme_css(theme)
             self.assertIsInstance(css, str)
             self.assertIn(".hljs", css)
@@ -585,50 +586,33 @@ class TestSanitizeCssSize(unittest.TestCase):
         self.assertEqual(md_converter.sanitize_css_size("", "50px"), "50px")
 
 
-class TestSymlinkProtection(unittest.TestCase):
+class TestSymlinkProtection(_TempDirMixin, unittest.TestCase):
     """Test symlink protection in safe_read_file."""
 
     def test_symlink_outside_base_blocked(self):
         """Test that symlinks pointing outside base directory are blocked."""
-        import tempfile
-        import os
-
-        # Create temp directory structure
-        base_dir = tempfile.mkdtemp()
-        secret_file = tempfile.NamedTemporaryFile(mode='w', delete=False, dir='/tmp')
-        secret_file.write('SECRET_DATA')
-        secret_file.close()
+        # Create temp directory structure with the secret outside base_dir
+        base_dir = os.path.join(self.tmp_dir, 'base')
+        os.mkdir(base_dir)
+        secret_path = os.path.join(self.tmp_dir, 'secret.txt')
+        with open(secret_path, 'w') as f:
+            f.write('SECRET_DATA')
 
         # Create symlink inside base_dir pointing to secret file
-        symlink_path = os.path.join(base_dir, 'symlink.md')
-        os.symlink(secret_file.name, symlink_path)
-
-        try:
-            # This should raise ValueError because symlink resolves outside base
-            with self.assertRaises(ValueError) as context:
-                md_converter.safe_read_file(base_dir, 'symlink.md')
-            self.assertIn("Security violation", str(context.exception))
-        finally:
-            os.unlink(symlink_path)
-            os.unlink(secret_file.name)
-            os.rmdir(base_dir)
+        os.symlink(secret_path, os.path.join(base_dir, 'symlink.md'))
+
+        # This should raise ValueError because symlink resolves outside base
+        with self.assertRaises(ValueError) as context:
+            md_converter.safe_read_file(base_dir, 'symlink.md')
+        self.assertIn("Security violation", str(context.exception))
 
     def test_regular_file_inside_base_allowed(self):
         """Test that regular files inside base directory are allowed."""
-        import tempfile
-        import os
-
-        base_dir = tempfile.mkdtemp()
-        test_file = os.path.join(base_dir, 'test.md')
-        with open(test_file, 'w') as f:
+        with open(os.path.join(self.tmp_dir, 'test.md'), 'w') as f:
             f.write('test content')
 
-        try:
-            content = md_converter.safe_read_file(base_dir, 'test.md')
-            self.assertEqual(content, 'test content')
-        finally:
-            os.unlink(test_file)
-            os.rmdir(base_dir)
+        content = md_converter.safe_read_file(self.tmp_dir, 'test.md')
+        self.assertEqual(content, 'test content')
 
 
 class TestScriptTagEscapeBypass(unittest.TestCase):
@@ -683,38 +667,29 @@ class TestSanitizeFilenameCaseSensitivity(unittest.TestCase):
         self.assertEqual(result.count('.html'), 1)
 
 
-class TestDeepNestingParsing(unittest.TestCase):
+class TestDeepNestingParsing(_TempDirMixin, unittest.TestCase):
     """Test parsing of deeply nested SUMMARY.md files."""
 
     def test_more_than_10_levels(self):
         """Test parsing with more than 10 nesting levels doesn't crash."""
-        import tempfile
-        import os
-
         # Create deeply nested summary
         lines = ["# Summary\n"]
         for i in range(15):  # 15 levels deep
             indent = "  " * i
             lines.append(f"{indent}- [Level {i}](l{i}.md)\n")
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+        temp_path = os.path.join(self.tmp_dir, 'SUMMARY.md')
+        with open(temp_path, 'w') as f:
             f.writelines(lines)
-            temp_path = f.name
 
-        try:
-            # This should not raise IndexError
-            chapters = md_converter.parse_summary_md(temp_path)
-            self.assertEqual(len(chapters), 15)
-            # Verify deepest chapter has correct level
-            self.assertEqual(chapters[-1].level, 14)
-        finally:
-            os.unlink(temp_path)
+        # This should not raise IndexError
+        chapters = md_converter.parse_summary_md(temp_path)
+        self.assertEqual(len(chapters), 15)
+        # Verify deepest chapter has correct level
+        self.assertEqual(chapters[-1].level, 14)
 
     def test_chapter_numbering_deep_nesting(self):
         """Test chapter numbering works correctly with deep nesting."""
-        import tempfile
-        import os
-
         summary = """# Summary
 
 - [Ch 1](c1.md)
@@ -723,16 +698,13 @@ class TestDeepNestingParsing(unittest.TestCase):
 - [Ch 2](c2.md)
   - [Ch 2.1](c21.md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+        temp_path = os.path.join(self.tmp_dir, 'SUMMARY.md')
+        with open(temp_path, 'w') as f:
             f.write(summary)
-            temp_path = f.name
 
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            numbers = [c.number for c in chapters if c.number]
-            self.assertEqual(numbers, ['1', '1.1', '1.1.1', '2', '2.1'])
-        finally:
-            os.unlink(temp_path)
+        chapters = md_converter.parse_summary_md(temp_path)
+        numbers = [c.number for c in chapters if c.number]
+        self.assertEqual(numbers, ['1', '1.1', '1.1.1', '2', '2.1'])
 
 
 class TestPathWithParentheses(unittest.TestCase):
@@ -740,64 +712,43 @@ class TestPathWithParentheses(unittest.TestCase):
 
     def test_path_with_parentheses(self):
         """Test that paths with parentheses are parsed correctly."""
-        import tempfile
-        import os
-
         summary = """# Summary
 
 - [Chapter](path(with)parens.md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write(summary)
-            temp_path = f.name
-
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            chapter = [c for c in chapters if c.path][0]
-            self.assertEqual(chapter.path, "path(with)parens.md")
-        finally:
-            os.unlink(temp_path)
+        chapters = md_converter._parse_summary_md_text(summary)
+        chapter = next(c for c in chapters if c.path)
+        self.assertEqual(chapter.path, "path(with)parens.md")
 
     def test_path_with_nested_parentheses(self):
         """Test that paths with nested parentheses are parsed correctly."""
-        import tempfile
-        import os
-
         summary = """# Summary
 
 - [Chapter](path(with(nested))parens.md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write(summary)
-            temp_path = f.name
-
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            chapter = [c for c in chapters if c.path][0]
-            self.assertEqual(chapter.path, "path(with(nested))parens.md")
-        finally:
-            os.unlink(temp_path)
+        chapters = md_converter._parse_summary_md_text(summary)
+        chapter = next(c for c in chapters if c.path)
+        self.assertEqual(chapter.path, "path(with(nested))parens.md")
 
     def test_empty_path_draft(self):
         """Test that empty paths are recognized as drafts."""
-        import tempfile
-        import os
-
         summary = """# Summary
 
 - [Draft Chapter]()
 """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write(summary)
-            temp_path = f.name
+        chapters = md_converter._parse_summary_md_text(summary)
+        chapter = next(c for c in chapters if not c.is_separator and not c.is_part_title)
+        self.assertTrue(chapter.is_draft)
+        self.assertIsNone(chapter.path)
+
+    def test_invisible_characters_stripped_from_titles(self):
+        """Test that zero-width and bidi control characters are removed from titles."""
+        summary = """# Pa\u200brt
 
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            chapter = [c for c in chapters if not c.is_separator and not c.is_part_title][0]
-            self.assertTrue(chapter.is_draft)
-            self.assertIsNone(chapter.path)
-        finally:
-            os.unlink(temp_path)
+- [Read\u202eme\ufeff](readme.md)
+"""
+        chapters = md_converter._parse_summary_md_text(summary)
+        self.assertEqual([c.title for c in chapters], ["Part", "Readme"])
 
 
 class TestCombineChaptersHeadingLevel(unittest.TestCase):
@@ -864,21 +815,11 @@ class TestValidateProjectPathSymlink(unittest.TestCase):
 
     def test_symlink_to_sensitive_dir_blocked(self):
         """Test that symlinks pointing to sensitive directories are blocked."""
-        import tempfile
-        import os
-
-        # Create a symlink pointing to /etc
-        temp_dir = tempfile.mkdtemp()
-        symlink_path = os.path.join(temp_dir, 'etc_link')
-
-        try:
-            os.symlink('/etc', symlink_path)
-            is_valid, error = md_converter.validate_project_path(symlink_path)
-            self.assertFalse(is_valid)
-            self.assertIn("/etc", error)
-        finally:
-            os.unlink(symlink_path)
-            os.rmdir(temp_dir)
+        # Simulate a project path whose symlink resolves to /etc
+        with patch('md_converter.os.path.realpath', return_value='/etc'):
+            is_valid, error = md_converter.validate_project_path('/home/user/etc_link')
+        self.assertFalse(is_valid)
+        self.assertIn("/etc", error)
 
 
 class TestTabIndentation(unittest.TestCase):
@@ -886,9 +827,6 @@ class TestTabIndentation(unittest.TestCase):
 
     def test_tab_indentation(self):
         """Test that tab characters are handled correctly."""
-        import tempfile
-        import os
-
         # Use tabs for indentation (1 tab = 4 spaces = 2 levels)
         summary = """# Summary
 
@@ -896,23 +834,13 @@ class TestTabIndentation(unittest.TestCase):
 \t- [Level 2](l2.md)
 \t\t- [Level 4](l4.md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write(summary)
-            temp_path = f.name
-
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            levels = [c.level for c in chapters if c.path]
-            # 1 tab = 4 spaces = 2 levels
-            self.assertEqual(levels, [0, 2, 4])
-        finally:
-            os.unlink(temp_path)
+        chapters = md_converter._parse_summary_md_text(summary)
+        levels = [c.level for c in chapters if c.path]
+        # 1 tab = 4 spaces = 2 levels
+        self.assertEqual(levels, [0, 2, 4])
 
     def test_mixed_tabs_and_spaces(self):
         """Test mixed tab and space indentation."""
-        import tempfile
-        import os
-
         # Mix tabs and spaces
         summary = """# Summary
 
@@ -920,16 +848,9 @@ class TestTabIndentation(unittest.TestCase):
   - [Level 1](l1.md)
 \t- [Level 2](l2.md)
 """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write(summary)
-            temp_path = f.name
-
-        try:
-            chapters = md_converter.parse_summary_md(temp_path)
-            levels = [c.level for c in chapters if c.path]
-            self.assertEqual(levels, [0, 1, 2])
-        finally:
-            os.unlink(temp_path)
+        chapters = md_converter._parse_summary_md_text(summary)
+        levels = [c.level for c in chapters if c.path]
+        self.assertEqual(levels, [0, 1, 2])
 
 
 class TestByteCountTruncation(unittest.TestCase):